@@ -1,5 +1,5 @@
-from crewai import Agent, Task, Crew, LLM
-from crewai_tools import SerperDevTool
+from crewai import Agent, Task, Crew
+from factory import get_llm, get_search_tool
 from dotenv import load_dotenv
 import os
 
@@ -9,11 +9,10 @@ os.environ['SERPER_API_KEY'] = os.getenv("SERPER_API_KEY")
 topic = "Medical Industry using Generative AI"
 
 # Tool 1: Language Model
-llm = LLM(model="gpt-3.5-turbo",
-          api_key=os.getenv("OPENAI_API_KEY"))
+llm = get_llm("gpt-3.5-turbo")
 
-# Tool 2: Web Search Tool
-search_tool = SerperDevTool(n=10)
+# Tool 2: Web Search Tool (results cached on disk and shared across runs)
+search_tool = get_search_tool(n_results=10)
 
 # Agent 1: Senior Research Analyst
 senior_research_analyst = Agent(
@@ -1,25 +1,24 @@
-from crewai import Agent, Task, LLM
-from crewai_tools import SerperDevTool
+from crewai import Agent, Task
 from dotenv import load_dotenv
 import os
-import agentops
+from factory import get_llm, get_search_tool, get_youtube_tool, init_telemetry
 from orch_two import ModuleOrchestrator
-from youtube_tool import YouTubeTranscriptTool  # Import your custom tool
 
 load_dotenv()
 os.environ['SERPER_API_KEY'] = os.getenv("SERPER_API_KEY")
 
-agentops.init(api_key=os.getenv("AGENTOPS_API_KEY"))
+# AgentOps starts on a background thread instead of delaying the first stage
+init_telemetry()
 
 # Define the module/topic (you can dynamically change this)
 topic = "Statistics In DataScience"
 
 # Tools: Web search + YouTube transcript fetcher
-search_tool = SerperDevTool(n=10)
-yt_tool = YouTubeTranscriptTool()
+search_tool = get_search_tool(n_results=10)
+yt_tool = get_youtube_tool()
 
 # LLM to be used across agents
-llm = LLM(model="gpt-3.5-turbo", api_key=os.getenv("OPENAI_API_KEY"))
+llm = get_llm("gpt-3.5-turbo")
 
 # Agent 1: Content Gatherer that extracts *real* transcripts
 content_gatherer = Agent(
@@ -56,7 +55,10 @@ gather_task = Task(
         Use web search to find YouTube videos about "{topic}".
         For each video:
         - Extract video title and URL
-        - Use the YouTube Transcript Tool to fetch the full spoken transcript
+        - Fetch the full spoken transcripts with ONE call to the YouTube Transcript Tool,
+          passing all video URLs together as `video_urls`
+        - Long videos come back one timestamped chunk at a time with a transcript index; request
+          the parts you need with `chunk` or `start_time`/`end_time` instead of stopping at the first chunk
         - Do NOT invent or summarize. Only use the actual transcript content.
 
         Format:
@@ -0,0 +1,60 @@
+# async_orchestrator.py
+
+import asyncio
+import functools
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from orch_memory import ModuleOrchestrator
+
+
+class AsyncModuleOrchestrator(ModuleOrchestrator):
+    """ModuleOrchestrator whose pipeline can be awaited from an event loop.
+
+    Crew.kickoff and the retry pause are blocking, so the stage sequence runs on an executor
+    thread; the event loop stays free to drive other topics meanwhile. Each instance keeps its
+    own logs and MemoryLayer, so concurrent topics never see each other's state.
+    """
+
+    async def run_pipeline_async(self, executor=None, resume=False):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, functools.partial(self.run_pipeline, resume=resume))
+
+
+async def run_topics(topics, build_tasks, max_concurrency=4, **orchestrator_kwargs):
+    """Run one pipeline per topic with at most max_concurrency running at once.
+
+    build_tasks(topic) must return fresh (gather, refine, compose, validate, evaluation) tasks:
+    CrewAI interpolates inputs into Task objects in place, so tasks cannot be shared across topics.
+    Returns one result dict per topic, in input order.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="pipeline") as executor:
+
+        async def run_one(topic):
+            async with semaphore:
+                orchestrator = None
+                try:
+                    tasks = build_tasks(topic)
+                    orchestrator = AsyncModuleOrchestrator(*tasks, topic=topic, **orchestrator_kwargs)
+                    output = await orchestrator.run_pipeline_async(executor)
+                    error = None
+                except Exception:
+                    output = None
+                    error = traceback.format_exc()
+                finally:
+                    if orchestrator:
+                        orchestrator.close()
+                return {
+                    "topic": topic,
+                    "output": output,
+                    "error": error,
+                    "logs": orchestrator.get_logs() if orchestrator else [],
+                    "memory": orchestrator.memory.get_history() if orchestrator else [],
+                }
+
+        return await asyncio.gather(*(run_one(topic) for topic in topics))
+
+
+def run_catalog(topics, build_tasks, max_concurrency=4, **orchestrator_kwargs):
+    return asyncio.run(run_topics(topics, build_tasks, max_concurrency, **orchestrator_kwargs))
@@ -0,0 +1,171 @@
+# batch_generate.py
+#
+# Generate learning modules for every topic in a JSONL or CSV file:
+#   python batch_generate.py topics.jsonl --out-dir outputs --workers 4
+#
+# Each finished topic writes <slug>.md (final output) and <slug>.logs.jsonl (orchestrator logs).
+# Re-running the same command resumes: topics whose .md already exists are skipped.
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import re
+import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+
+def read_topics(path):
+    topics = []
+    if path.lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.reader(f))
+        header = [c.strip().lower() for c in rows[0]] if rows else []
+        if "topic" in header:
+            column = header.index("topic")
+            rows = rows[1:]
+        else:
+            column = 0
+        topics = [row[column].strip() for row in rows if len(row) > column and row[column].strip()]
+    else:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                topic = record.get("topic") if isinstance(record, dict) else record
+                if topic and str(topic).strip():
+                    topics.append(str(topic).strip())
+
+    # Drop duplicates while keeping file order
+    return list(dict.fromkeys(topics))
+
+
+def topic_slug(topic):
+    # Readable prefix plus a hash of the exact topic, so "C++" and "C" get different files
+    base = re.sub(r"[^a-z0-9]+", "_", topic.lower()).strip("_")[:60].rstrip("_") or "topic"
+    return f"{base}_{hashlib.sha1(topic.encode('utf-8')).hexdigest()[:8]}"
+
+
+def output_paths(out_dir, topic):
+    slug = topic_slug(topic)
+    return os.path.join(out_dir, f"{slug}.md"), os.path.join(out_dir, f"{slug}.logs.jsonl")
+
+
+def write_atomic(path, text):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def _init_worker():
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    if os.getenv("SERPER_API_KEY"):
+        os.environ["SERPER_API_KEY"] = os.getenv("SERPER_API_KEY")
+
+
+def run_topic(topic, force_regenerate=False):
+    # Runs inside a worker process; imports stay here so the parent never loads CrewAI
+    from module_tasks import build_tasks
+    from orch_memory import ModuleOrchestrator
+
+    orchestrator = None
+    try:
+        tasks = build_tasks(topic)
+        orchestrator = ModuleOrchestrator(*tasks, topic=topic, force_regenerate=force_regenerate)
+        # A topic that failed in an earlier batch restarts at its first incomplete stage
+        output = orchestrator.run_pipeline(resume=not force_regenerate)
+        ok = isinstance(output, str) and not output.startswith("❌")
+        return {"topic": topic, "ok": ok, "output": output, "logs": orchestrator.get_logs()}
+    except Exception:
+        logs = orchestrator.get_logs() if orchestrator else []
+        return {"topic": topic, "ok": False, "output": None, "logs": logs, "error": traceback.format_exc()}
+    finally:
+        if orchestrator:
+            orchestrator.close()
+
+
+def run_pool(topics, out_dir, force, workers):
+    # (failed, completed, interrupted topics); a worker that dies (OOM kill, segfault) breaks the
+    # pool and every topic still queued or running in it raises BrokenProcessPool
+    failed = completed = 0
+    broken = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = {pool.submit(run_topic, topic, force): topic for topic in topics}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except BrokenProcessPool:
+                broken.append(futures[future])
+                continue
+            completed += 1
+            failed += not record_result(out_dir, result)
+    # as_completed yields in completion order; retry in file order
+    return failed, completed, [topic for topic in topics if topic in broken]
+
+
+def record_result(out_dir, result):
+    topic = result["topic"]
+    output_path, logs_path = output_paths(out_dir, topic)
+
+    logs = "".join(json.dumps(entry, ensure_ascii=False, default=str) + "\n" for entry in result["logs"])
+    if result.get("error"):
+        logs += json.dumps({"step": "Batch", "status": "Error", "detail": result["error"]}) + "\n"
+    write_atomic(logs_path, logs)
+
+    # Only successful outputs are written, so failed topics are retried on resume
+    if result["ok"]:
+        write_atomic(output_path, result["output"])
+        print(f"✅ {topic} -> {output_path}")
+        return True
+    print(f"❌ {topic} failed, see {logs_path}")
+    return False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate learning modules for a file of topics.")
+    parser.add_argument("topics_file", help="JSONL ({\"topic\": ...} per line) or CSV (topic column) file")
+    parser.add_argument("--out-dir", default="outputs", help="Directory for per-topic outputs and logs")
+    parser.add_argument("--workers", type=int, default=4, help="Number of pipeline processes")
+    parser.add_argument("--force", action="store_true", help="Regenerate topics that already have outputs")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    topics = read_topics(args.topics_file)
+    pending = [t for t in topics if args.force or not os.path.exists(output_paths(args.out_dir, t)[0])]
+    print(f"📚 {len(topics)} topics, {len(topics) - len(pending)} already done, {len(pending)} to generate.")
+
+    failed = 0
+    workers = max(1, args.workers)
+    while pending:
+        round_failed, completed, broken = run_pool(pending, args.out_dir, args.force, workers)
+        failed += round_failed
+        if not broken:
+            break
+        print(f"⚠️ A worker process crashed; {len(broken)} interrupted topics will be retried.")
+        if not completed:
+            # No progress: run each remaining topic in a pool of its own, so only the topic that
+            # kills its worker fails
+            for topic in broken:
+                round_failed, _, crashed = run_pool([topic], args.out_dir, args.force, 1)
+                failed += round_failed
+                if crashed:
+                    failed += not record_result(args.out_dir, {
+                        "topic": topic, "ok": False, "output": None, "logs": [],
+                        "error": "Worker process crashed (BrokenProcessPool); the topic will be retried on the next run.",
+                    })
+            break
+        pending = broken
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,307 @@
+# benchmarks/bench_orchestrator.py
+#
+# Offline benchmark of the ModuleOrchestrator variants. Crew.kickoff is replaced by a deterministic
+# fake model (fixed latency, fixed output size) and the search/transcript tools by local fakes, so
+# no API key or network is needed. Everything is written under a temporary working directory.
+#
+#   python benchmarks/bench_orchestrator.py --latency 0.05 --output-chars 4000 --topics 8 --concurrency 4
+
+import argparse
+import asyncio
+import builtins
+import hashlib
+import json
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import orchestrator  # noqa: E402
+import orch_memory  # noqa: E402
+import orch_two  # noqa: E402
+import stage_helpers  # noqa: E402
+import async_orchestrator  # noqa: E402
+from llm_cache import LLMResultCache  # noqa: E402
+from log_sink import LogSink  # noqa: E402
+
+WORDS = (
+    "statistics data science regression variance probability distribution sampling hypothesis "
+    "inference model feature bias estimate mean median deviation correlation dataset"
+).split()
+
+
+def fake_text(seed, chars):
+    # Deterministic pseudo-prose of exactly `chars` characters
+    digest = hashlib.sha256(seed.encode("utf-8")).digest()
+    words = []
+    length = 0
+    i = 0
+    while length < chars:
+        word = WORDS[(digest[i % len(digest)] + i) % len(WORDS)]
+        words.append(word)
+        length += len(word) + 1
+        i += 1
+    text = " ".join(words)
+    return text[:chars]
+
+
+class FakeSearchTool:
+    name = "Search the internet"
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    def run(self, query):
+        time.sleep(self.latency)
+        return "\n".join(f"Source: https://example.com/{i}\n{fake_text(query + str(i), 300)}" for i in range(5))
+
+
+class FakeYouTubeTool:
+    name = "YouTube Transcript Tool"
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    def run(self, video_url):
+        time.sleep(self.latency)
+        return fake_text(video_url, 4000)
+
+
+class FakeModel:
+    """Shared configuration and accounting for the fake Crew."""
+
+    def __init__(self, latency, output_chars, tool_latency):
+        self.latency = latency
+        self.output_chars = output_chars
+        self.tool_latency = tool_latency
+        self.model_seconds = {}
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def crew_class(self):
+        model = self
+
+        class FakeCrew:
+            def __init__(self, agents, tasks, verbose=False, **kwargs):
+                self.task = tasks[0]
+                self.usage_metrics = {"prompt_tokens": 0, "completion_tokens": 0}
+
+            def kickoff(self, inputs=None):
+                started = time.perf_counter()
+                role = self.task.agent.role
+                for tool in getattr(self.task.agent, "tools", []):
+                    tool.run(inputs.get("topic", ""))
+                time.sleep(model.latency)
+                prompt = json.dumps(inputs, default=str)
+                output = f"{inputs.get('topic', '')}: " + fake_text(role + prompt[:200], model.output_chars)
+                self.usage_metrics = {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(output) // 4}
+                with model._lock:
+                    model.calls += 1
+                    model.model_seconds[role] = model.model_seconds.get(role, 0.0) + time.perf_counter() - started
+                return SimpleNamespace(output=output, token_usage=self.usage_metrics)
+
+        return FakeCrew
+
+
+def build_tasks(model, stages):
+    llm = SimpleNamespace(model="gpt-3.5-turbo")
+    tools = {
+        "Content Gatherer": [FakeSearchTool(model.tool_latency), FakeYouTubeTool(model.tool_latency)],
+    }
+    roles = ["Content Gatherer", "Contextual Refiner", "Structured Output Composer",
+             "Content Quality Validator", "Content Evaluator"][:stages]
+    return [
+        SimpleNamespace(
+            description=f"Benchmark task for {role} on {{topic}}",
+            expected_output="Benchmark output",
+            agent=SimpleNamespace(role=role, llm=llm, tools=tools.get(role, [])),
+        )
+        for role in roles
+    ]
+
+
+def instrument(orch, timings):
+    # Wall time per stage around execute_task, plus time spent in memory injection and logging
+    execute_task = orch.execute_task
+
+    def timed_execute(task, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return execute_task(task, *args, **kwargs)
+        finally:
+            key = ("stage", task.agent.role)
+            timings[key] = timings.get(key, 0.0) + time.perf_counter() - started
+
+    orch.execute_task = timed_execute
+
+    for name, target in (("log", orch), ("inject_memory", getattr(orch, "memory", None))):
+        if target is None:
+            continue
+        method = getattr(target, name)
+
+        def timed(*args, _method=method, _name=name, **kwargs):
+            started = time.perf_counter()
+            try:
+                return _method(*args, **kwargs)
+            finally:
+                timings[_name] = timings.get(_name, 0.0) + time.perf_counter() - started
+
+        setattr(target, name, timed)
+
+
+def new_orchestrator(module, tasks, topic, workdir, **kwargs):
+    kwargs = dict(
+        cache=LLMResultCache(os.path.join(workdir, "cache")),
+        force_regenerate=True,
+        log_sink=LogSink(name=topic, log_dir=os.path.join(workdir, "logs")),
+        **kwargs,
+    )
+    return module.ModuleOrchestrator(*tasks, topic=topic, **kwargs)
+
+
+def bench_variant(name, module, stages, model, args, workdir):
+    model.model_seconds.clear()
+    timings = {}
+    started = time.perf_counter()
+    for i in range(args.topics):
+        orch = new_orchestrator(module, build_tasks(model, stages), f"Benchmark Topic {i}", workdir)
+        instrument(orch, timings)
+        orch.run_pipeline()
+        orch.close()
+    wall = time.perf_counter() - started
+
+    overhead = {}
+    for (kind, role), seconds in ((k, v) for k, v in timings.items() if isinstance(k, tuple)):
+        overhead[role] = round((seconds - model.model_seconds.get(role, 0.0)) / args.topics * 1000, 3)
+    return {
+        "variant": name,
+        "pipelines": args.topics,
+        "wall_seconds": round(wall, 3),
+        "pipelines_per_second": round(args.topics / wall, 3),
+        "overhead_ms_per_stage": overhead,
+        "log_ms_per_pipeline": round(timings.get("log", 0.0) / args.topics * 1000, 3),
+        "inject_memory_ms_per_pipeline": round(timings.get("inject_memory", 0.0) / args.topics * 1000, 3),
+    }
+
+
+def bench_concurrency(model, args, workdir):
+    results = []
+    for concurrency in sorted({1, args.concurrency, args.concurrency * 2}):
+        started = time.perf_counter()
+        asyncio.run(async_orchestrator.run_topics(
+            [f"Concurrent Topic {i}" for i in range(args.topics)],
+            lambda topic: build_tasks(model, 5),
+            max_concurrency=concurrency,
+            cache=LLMResultCache(os.path.join(workdir, "cache")),
+            force_regenerate=True,
+        ))
+        wall = time.perf_counter() - started
+        results.append({"concurrency": concurrency, "wall_seconds": round(wall, 3),
+                        "pipelines_per_second": round(args.topics / wall, 3)})
+    return results
+
+
+def bench_scaling(model, args, workdir):
+    # How memory injection and logging cost grow with stage output size
+    results = []
+    original_chars = model.output_chars
+    for chars in (1_000, 10_000, 100_000, 1_000_000):
+        model.output_chars = chars
+        timings = {}
+        tracemalloc.start()
+        orch = new_orchestrator(orch_memory, build_tasks(model, 5), "Scaling Topic", workdir)
+        instrument(orch, timings)
+        orch.run_pipeline()
+        orch.close()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results.append({
+            "output_chars": chars,
+            "log_ms": round(timings.get("log", 0.0) * 1000, 3),
+            "inject_memory_ms": round(timings.get("inject_memory", 0.0) * 1000, 3),
+            "injected_memory_chars": sum(len(str(m["content"])) for m in orch.memory.select(orch.memory.default_policy)),
+            "python_peak_mb": round(peak / 1e6, 2),
+        })
+    model.output_chars = original_chars
+    return results
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline ModuleOrchestrator benchmark with a fake LLM and tools.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake model latency per call (seconds)")
+    parser.add_argument("--tool-latency", type=float, default=0.01, help="Fake search/transcript latency (seconds)")
+    parser.add_argument("--output-chars", type=int, default=4000, help="Fake model output size")
+    parser.add_argument("--topics", type=int, default=8, help="Pipelines per scenario")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrency for the async scenario")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    model = FakeModel(args.latency, args.output_chars, args.tool_latency)
+    fake_crew = model.crew_class()
+    stage_helpers.Crew = fake_crew  # execute_task, shared by every orchestrator
+
+    workdir = tempfile.mkdtemp(prefix="orchestrator-bench-")
+    os.chdir(workdir)  # metrics summaries and the corpus index land here too
+
+    # Warm-up: builds the corpus index used for relevance scoring
+    with open(os.devnull, "w") as devnull:
+        stdout, sys.stdout = sys.stdout, devnull
+        try:
+            new_orchestrator(orch_two, build_tasks(model, 2), "Warm Up", workdir).run_pipeline()
+        finally:
+            sys.stdout = stdout
+
+    console_print = builtins.print
+    builtins.print = lambda *a, **k: None  # silence per-entry console logging while measuring
+    try:
+        report = {
+            "config": vars(args),
+            "variants": [
+                bench_variant("orchestrator.py", orchestrator, 5, model, args, workdir),
+                bench_variant("orch_memory.py", orch_memory, 5, model, args, workdir),
+                bench_variant("orch_two.py", orch_two, 2, model, args, workdir),
+            ],
+            "concurrency": bench_concurrency(model, args, workdir),
+            "scaling": bench_scaling(model, args, workdir),
+        }
+    finally:
+        builtins.print = console_print
+    report["peak_rss_mb"] = peak_rss_mb()
+    report["workdir"] = workdir
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return report
+
+    print(f"Fake model: {args.latency * 1000:.0f} ms/call, {args.output_chars} chars; workdir {workdir}\n")
+    print("Throughput and per-stage orchestrator overhead (model time excluded):")
+    for v in report["variants"]:
+        print(f"  {v['variant']:<16} {v['pipelines_per_second']:>7.2f} pipelines/s  "
+              f"log {v['log_ms_per_pipeline']:.1f} ms  inject_memory {v['inject_memory_ms_per_pipeline']:.1f} ms")
+        for role, ms in v["overhead_ms_per_stage"].items():
+            print(f"      {role:<28} {ms:>8.2f} ms")
+    print("\nConcurrency (async_orchestrator.run_topics):")
+    for c in report["concurrency"]:
+        print(f"  {c['concurrency']:>3} concurrent  {c['wall_seconds']:>7.2f} s  {c['pipelines_per_second']:>7.2f} pipelines/s")
+    print("\nScaling with output size (orch_memory.py, one pipeline):")
+    for s in report["scaling"]:
+        print(f"  {s['output_chars']:>9} chars  log {s['log_ms']:>8.2f} ms  inject_memory {s['inject_memory_ms']:>7.2f} ms  "
+              f"injected {s['injected_memory_chars']:>7} chars  peak {s['python_peak_mb']:>7.2f} MB")
+    print(f"\nPeak RSS: {report['peak_rss_mb']} MB")
+    return report
+
+
+if __name__ == "__main__":
+    main()
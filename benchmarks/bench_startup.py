@@ -0,0 +1,150 @@
+# benchmarks/bench_startup.py
+#
+# Cold-start benchmark. Every measurement runs in a fresh interpreter so nothing is already imported:
+#   - import time of the modules the entry points load
+#   - time to first stage: wall time from spawning a process to the first Crew.kickoff of an
+#     orch_memory pipeline, with lazily built tasks (module_tasks default) and with the old eager
+#     path (every agent, task and tool built up front, AgentOps initialised inline)
+# Crew is replaced by a stub that records the time and exits, so no API key or network is needed.
+#
+#   python benchmarks/bench_startup.py --runs 5 --budget-ms 3000
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_TARGETS = ["factory", "module_tasks", "orch_memory", "batch_generate"]
+
+IMPORT_SNIPPET = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+started = time.perf_counter()
+import {module}
+print(json.dumps({{"seconds": time.perf_counter() - started}}))
+"""
+
+
+def first_stage(mode):
+    # Child process: run one pipeline until its first Crew.kickoff
+    sys.path.insert(0, ROOT)
+    os.environ.setdefault("OPENAI_API_KEY", "bench-startup")
+    os.environ.setdefault("SERPER_API_KEY", "bench-startup")
+
+    import orch_memory
+    import stage_helpers
+    from factory import init_telemetry
+    from llm_cache import LLMResultCache
+    from log_sink import LogSink
+    from module_tasks import build_tasks
+
+    class FirstStageCrew:
+        def __init__(self, agents, tasks, **kwargs):
+            self.role = tasks[0].agent.role
+
+        def kickoff(self, inputs=None):
+            sys.stdout.write(json.dumps({"first_stage": time.time(), "role": self.role}) + "\n")
+            sys.stdout.flush()
+            os._exit(0)  # skips the orchestrator's retry handling and interpreter teardown
+
+    stage_helpers.Crew = FirstStageCrew
+    init_telemetry(background=mode == "lazy")
+    topic = "Startup Benchmark"
+    orch = orch_memory.ModuleOrchestrator(
+        *build_tasks(topic, lazy=mode == "lazy"),
+        topic=topic,
+        cache=LLMResultCache(os.path.join(".cache", "llm")),
+        force_regenerate=True,
+        log_sink=LogSink(name=topic, log_dir="logs"),
+    )
+    orch.run_pipeline()
+    sys.exit("pipeline finished without reaching Crew.kickoff")
+
+
+def spawn(args, workdir):
+    # (wall seconds from spawn to exit, last stdout line as JSON)
+    started = time.time()
+    proc = subprocess.run([sys.executable, *args], cwd=workdir, capture_output=True, text=True)
+    finished = time.time()
+    lines = [line for line in proc.stdout.splitlines() if line.startswith("{")]
+    if proc.returncode != 0 or not lines:
+        raise RuntimeError(f"{' '.join(args)} failed ({proc.returncode}):\n{proc.stderr[-2000:]}")
+    return started, finished, json.loads(lines[-1])
+
+
+def summarize(samples):
+    ms = sorted(s * 1000 for s in samples)
+    return {"median_ms": round(statistics.median(ms), 1), "min_ms": round(ms[0], 1), "max_ms": round(ms[-1], 1)}
+
+
+def bench_imports(runs, workdir):
+    results = {}
+    for module in IMPORT_TARGETS:
+        samples = []
+        for _ in range(runs):
+            _, _, report = spawn(["-c", IMPORT_SNIPPET.format(root=ROOT, module=module)], workdir)
+            samples.append(report["seconds"])
+        results[module] = summarize(samples)
+    return results
+
+
+def bench_first_stage(runs, workdir):
+    results = {}
+    for mode in ("lazy", "eager"):
+        samples = []
+        for _ in range(runs):
+            started, _, report = spawn([os.path.abspath(__file__), "--child", mode], workdir)
+            samples.append(report["first_stage"] - started)
+        results[mode] = summarize(samples)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cold-start benchmark: import time and time to first stage.")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh processes per measurement")
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="Exit non-zero when the median lazy time to first stage exceeds this")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument("--child", choices=["lazy", "eager"], help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        return first_stage(args.child)
+
+    workdir = tempfile.mkdtemp(prefix="startup-bench-")
+    report = {
+        "config": {"runs": args.runs, "budget_ms": args.budget_ms, "python": sys.version.split()[0]},
+        "imports": bench_imports(args.runs, workdir),
+        "first_stage": bench_first_stage(args.runs, workdir),
+        "workdir": workdir,
+    }
+    lazy_ms = report["first_stage"]["lazy"]["median_ms"]
+    report["within_budget"] = args.budget_ms is None or lazy_ms <= args.budget_ms
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"Cold start over {args.runs} fresh processes each; workdir {workdir}\n")
+        print("Import time:")
+        for module, s in report["imports"].items():
+            print(f"  {module:<16} {s['median_ms']:>8.1f} ms  (min {s['min_ms']:.1f}, max {s['max_ms']:.1f})")
+        print("\nTime to first stage (spawn to first Crew.kickoff, orch_memory.py):")
+        for mode, s in report["first_stage"].items():
+            print(f"  {mode:<16} {s['median_ms']:>8.1f} ms  (min {s['min_ms']:.1f}, max {s['max_ms']:.1f})")
+        if args.budget_ms is not None:
+            verdict = "✅ within" if report["within_budget"] else "❌ over"
+            print(f"\n{verdict} budget: {lazy_ms:.1f} ms vs {args.budget_ms:.0f} ms")
+
+    if not report["within_budget"]:
+        sys.exit(1)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+# cached_search_tool.py
+
+from crewai_tools import SerperDevTool
+from search_cache import search_cache
+
+# Tool settings that change what Serper returns, so they are part of the cache key
+SEARCH_PARAMS = ("search_type", "country", "location", "locale")
+
+
+class CachedSerperDevTool(SerperDevTool):
+    """Drop-in SerperDevTool: same name, schema and output, served from the shared search cache.
+
+    Repeated and near-identical (case/whitespace) queries within a run or across topics reuse the
+    stored result; identical queries in flight at the same time share one request.
+    """
+
+    def _run(self, **kwargs):
+        query = kwargs.get("search_query") or kwargs.get("query")
+        if not query:
+            return SerperDevTool._run(self, **kwargs)
+        n_results = kwargs.get("n_results") or getattr(self, "n_results", None)
+        params = {name: getattr(self, name, None) for name in SEARCH_PARAMS}
+        return search_cache.get_or_fetch(query, n_results, lambda: SerperDevTool._run(self, **kwargs), **params)
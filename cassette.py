@@ -0,0 +1,165 @@
+# cassette.py
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+
+
+class CassetteMiss(Exception):
+    """Raised in replay mode when a request was never recorded."""
+
+
+def _fingerprint(kind, name, payload):
+    blob = json.dumps([kind, name, payload], sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:32]
+
+
+class Cassette:
+    """Record or replay every LLM call and tool run made while the context is active.
+
+    record: calls go out as usual and each (request fingerprint, response, latency) is appended to a
+    gzipped JSONL cassette on exit. replay: responses are served from the cassette in recorded order
+    per fingerprint, with no network; simulate_latency sleeps the recorded time (times latency_scale).
+
+    Patching is process-wide: crewai.LLM.call, crewai.tools.BaseTool.run for direct tool calls, and
+    BaseTool.to_structured_tool, whose CrewStructuredTool(func=tool._run) is what agents invoke. One
+    cassette may be entered by several concurrent pipelines, but keep a single cassette active per
+    process, and enter it before the crews it should capture start their tasks.
+    """
+
+    def __init__(self, path, mode="replay", simulate_latency=False, latency_scale=1.0):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.simulate_latency = simulate_latency
+        self.latency_scale = latency_scale
+        self.records = []
+        self.served = 0
+        self._replay = {}
+        self._lock = threading.Lock()
+        self._patched = []
+        self._local = threading.local()  # a tool calling another tool is recorded once, as the outer call
+        self._depth = 0  # nested/concurrent entries; patch on the first, restore and save on the last
+
+    def _load(self):
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                self._replay.setdefault(record["key"], []).append(record)
+
+    def _save(self):
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            for record in self.records:
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        os.replace(tmp_path, self.path)
+
+    def _intercept(self, kind, name, payload, call):
+        key = _fingerprint(kind, name, payload)
+        if self.mode == "replay":
+            with self._lock:
+                queue = self._replay.get(key)
+                if not queue:
+                    raise CassetteMiss(f"No recorded {kind} response for {name} ({key})")
+                record = queue.pop(0) if len(queue) > 1 else queue[0]
+                self.served += 1
+            if self.simulate_latency:
+                time.sleep(record["latency"] * self.latency_scale)
+            if "error" in record:
+                raise RuntimeError(record["error"])
+            return record["response"]
+
+        started = time.perf_counter()
+        record = {"kind": kind, "name": name, "key": key}
+        try:
+            response = call()
+            record["response"] = response
+            return response
+        except Exception as e:
+            record["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            record["latency"] = round(time.perf_counter() - started, 4)
+            with self._lock:
+                self.records.append(record)
+
+    def _patch(self, owner, attribute, wrapper_factory):
+        original = getattr(owner, attribute)
+        setattr(owner, attribute, wrapper_factory(original))
+        self._patched.append((owner, attribute, original))
+
+    def __enter__(self):
+        with self._lock:
+            self._depth += 1
+            if self._depth == 1:
+                self._install()
+        return self
+
+    def _install(self):
+        from crewai import LLM
+        from crewai.tools import BaseTool
+
+        if self.mode == "replay":
+            self._replay = {}
+            self._load()
+            os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+            os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+        cassette = self
+
+        def llm_call(original):
+            def call(llm, messages, *args, **kwargs):
+                payload = {"model": getattr(llm, "model", None), "messages": messages}
+                return cassette._intercept("llm", str(payload["model"]), payload,
+                                           lambda: original(llm, messages, *args, **kwargs))
+            return call
+
+        def tool_call(name, func, args, kwargs):
+            if getattr(cassette._local, "in_tool", False):
+                return func(*args, **kwargs)
+            cassette._local.in_tool = True
+            try:
+                return cassette._intercept("tool", name, {"args": args, "kwargs": kwargs},
+                                           lambda: func(*args, **kwargs))
+            finally:
+                cassette._local.in_tool = False
+
+        def tool_run(original):
+            def run(tool, *args, **kwargs):
+                return tool_call(tool.name, lambda *a, **kw: original(tool, *a, **kw), args, kwargs)
+            return run
+
+        def structured_tool(original):
+            # Agents call structured.func, bound to tool._run when the crew starts the task, not BaseTool.run
+            def to_structured_tool(tool, *args, **kwargs):
+                structured = original(tool, *args, **kwargs)
+                func = structured.func
+                structured.func = lambda *a, **kw: tool_call(tool.name, func, a, kw)
+                return structured
+            return to_structured_tool
+
+        self._patch(LLM, "call", llm_call)
+        self._patch(BaseTool, "run", tool_run)
+        self._patch(BaseTool, "to_structured_tool", structured_tool)
+
+    def __exit__(self, exc_type, exc, tb):
+        with self._lock:
+            self._depth -= 1
+            if self._depth:
+                return False
+            for owner, attribute, original in reversed(self._patched):
+                setattr(owner, attribute, original)
+            self._patched = []
+            if self.mode == "record":
+                self._save()
+        return False
+
+    def stats(self):
+        if self.mode == "record":
+            return {"mode": "record", "recorded": len(self.records)}
+        return {"mode": "replay", "served": self.served}
@@ -0,0 +1,72 @@
+# checkpoint.py
+
+import json
+import os
+import re
+import threading
+import time
+
+
+class CheckpointStore:
+    """Per-run stage outputs and memory snapshots, one JSON file per (topic, run id).
+
+    Written atomically after every completed stage, so a crash or failed stage leaves the
+    last good state on disk for run_pipeline(resume=True).
+    """
+
+    def __init__(self, checkpoint_dir=".cache/checkpoints"):
+        self.checkpoint_dir = checkpoint_dir
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _slug(topic):
+        return re.sub(r"[^a-z0-9]+", "_", topic.lower()).strip("_") or "topic"
+
+    def _path(self, run_id, topic):
+        return os.path.join(self.checkpoint_dir, self._slug(topic), f"{run_id}.json")
+
+    def load(self, run_id, topic):
+        try:
+            with open(self._path(run_id, topic), "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # Slugs can collide; only accept the exact topic
+        return state if state.get("topic") == topic else None
+
+    def latest_run(self, topic):
+        # Most recently updated unfinished run id for the topic, or None; completed runs are never resumed
+        folder = os.path.join(self.checkpoint_dir, self._slug(topic))
+        try:
+            names = [n for n in os.listdir(folder) if n.endswith(".json")]
+        except OSError:
+            return None
+        for name in sorted(names, key=lambda n: os.path.getmtime(os.path.join(folder, n)), reverse=True):
+            run_id = name[: -len(".json")]
+            state = self.load(run_id, topic)
+            if state is not None and not state.get("completed"):
+                return run_id
+        return None
+
+    def save(self, run_id, topic, stage, output, memory=None, completed=False):
+        path = self._path(run_id, topic)
+        with self._lock:
+            state = self.load(run_id, topic) or {"run_id": run_id, "topic": topic, "stages": {}, "created": time.time()}
+            state["stages"][stage] = output
+            if memory is not None:
+                state["memory"] = memory
+            state["completed"] = completed
+            state["updated"] = time.time()
+
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(state, f, ensure_ascii=False, default=str)
+            os.replace(tmp_path, path)
+        return state
+
+    def delete(self, run_id, topic):
+        try:
+            os.remove(self._path(run_id, topic))
+        except OSError:
+            pass
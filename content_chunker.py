@@ -0,0 +1,136 @@
+# content_chunker.py
+
+import re
+
+# Lines that start a new source or section in a gathered content dump
+SECTION_BOUNDARY = re.compile(
+    r"^\s*(?:#{1,6}\s|(?:source|url|link|video url)s?\s*:|(?:-{3,}|\*{3,}|={3,})\s*$|\*\*[^*\n]+\*\*:?\s*$)",
+    re.IGNORECASE,
+)
+HEADING = re.compile(r"^\s*#{1,6}\s+(.*)$")
+
+
+def estimate_tokens(text):
+    # Roughly four characters per token for English text; avoids a tokenizer dependency
+    return (len(text) + 3) // 4
+
+
+def split_sections(text):
+    sections = []
+    current = []
+    for line in text.splitlines():
+        if SECTION_BOUNDARY.match(line) and any(l.strip() for l in current):
+            sections.append("\n".join(current).strip())
+            current = []
+        current.append(line)
+    if any(l.strip() for l in current):
+        sections.append("\n".join(current).strip())
+    return sections
+
+
+def _split_words(text, max_chars):
+    # Cut text into pieces of at most max_chars, breaking on whitespace unless a single word is longer
+    pieces = []
+    text = text.strip()
+    while len(text) > max_chars:
+        cut = text.rfind(" ", 0, max_chars + 1)
+        cut = max(cut, text.rfind("\n", 0, max_chars + 1))
+        if cut <= 0:
+            cut = max_chars
+        pieces.append(text[:cut].strip())
+        text = text[cut:].strip()
+    if text:
+        pieces.append(text)
+    return pieces
+
+
+def _split_oversized(section, token_budget):
+    """Split one section that is over budget into pieces, each carrying the section's source label.
+
+    The heading line (e.g. "## Source: https://...") stays with the first body piece and is repeated
+    on every continuation, so no chunk is a bare heading and every chunk says where its text came
+    from. Bodies break at paragraphs, then at word boundaries.
+    """
+    lines = section.strip().splitlines()
+    label = lines[0].strip() if lines and SECTION_BOUNDARY.match(lines[0]) else ""
+    body = "\n".join(lines[1:] if label else lines)
+    # Keep at least half the budget for body text even under a very long label
+    body_budget = max(token_budget // 2, token_budget - estimate_tokens(label) - 1) if label else token_budget
+
+    paragraphs = []
+    for paragraph in re.split(r"\n\s*\n", body):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if estimate_tokens(paragraph) <= body_budget:
+            paragraphs.append(paragraph)
+        else:
+            paragraphs.extend(_split_words(paragraph, body_budget * 4))
+
+    bodies = []
+    current = []
+    current_tokens = 0
+    for paragraph in paragraphs:
+        tokens = estimate_tokens(paragraph) + 1
+        if current and current_tokens + tokens > body_budget:
+            bodies.append("\n\n".join(current))
+            current = []
+            current_tokens = 0
+        current.append(paragraph)
+        current_tokens += tokens
+    if current:
+        bodies.append("\n\n".join(current))
+    if not label:
+        return bodies
+    return [f"{label}\n\n{text}" for text in bodies] or [label]
+
+
+def chunk_content(text, token_budget):
+    """Pack section-aligned pieces of text into chunks of at most token_budget estimated tokens."""
+    chunks = []
+    current = []
+    current_tokens = 0
+    for section in split_sections(text):
+        pieces = [section] if estimate_tokens(section) <= token_budget else _split_oversized(section, token_budget)
+        for piece in pieces:
+            piece_tokens = estimate_tokens(piece)
+            if current and current_tokens + piece_tokens > token_budget:
+                chunks.append("\n\n".join(current))
+                current = []
+                current_tokens = 0
+            current.append(piece)
+            current_tokens += piece_tokens
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+def merge_refined(parts):
+    """Merge refined chunks in order: same-named sections are combined and repeated paragraphs dropped."""
+    order = []
+    sections = {}
+    seen = set()
+    for part in parts:
+        key = None  # text before the first heading of a chunk
+        for paragraph in re.split(r"\n\s*\n", part.strip()):
+            lines = paragraph.strip().splitlines()
+            if not lines:
+                continue
+            match = HEADING.match(lines[0])
+            if match:
+                key = " ".join(match.group(1).lower().split())
+                if key not in sections:
+                    order.append(key)
+                    sections[key] = [lines[0].strip()]
+                lines = lines[1:]
+            elif key not in sections:
+                order.append(key)
+                sections[key] = []
+
+            body = "\n".join(lines).strip()
+            fingerprint = " ".join(body.lower().split())
+            if body and fingerprint not in seen:
+                seen.add(fingerprint)
+                sections[key].append(body)
+
+    return "\n\n".join("\n\n".join(sections[key]) for key in order if sections[key])
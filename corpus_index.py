@@ -0,0 +1,249 @@
+# corpus_index.py
+#
+# BM25 inverted index over heading-delimited sections of the text files in data/.
+# Build once with `python corpus_index.py` (or let CorpusIndex.open build on first use);
+# postings, document lengths and section offsets are flat uint32 arrays that are memory-mapped
+# at load time, so opening the index costs a small JSON vocabulary read.
+# Each build writes its files under a new generation name and publishes them by atomically
+# replacing meta.json, so concurrent workers never read a half-written index.
+
+import json
+import math
+import mmap
+import os
+import re
+import sys
+import threading
+import time
+from array import array
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+INDEX_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "corpus_index")
+INDEX_VERSION = 2
+GENERATION_FILE = re.compile(r"^(?:sections|postings|doclens|offsets)\.(?P<generation>[\w-]+)\.(?:jsonl|bin)$")
+
+TOKEN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have how in is it its of on or that the this to was "
+    "were what when where which who why will with you your can do does we our they their".split()
+)
+
+
+def tokenize(text):
+    return [t for t in TOKEN.findall(text.lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+def _is_heading(line, previous_blank):
+    stripped = line.strip()
+    if not stripped:
+        return False
+    if stripped.startswith("#"):
+        return True
+    return previous_blank and len(stripped) <= 80 and not stripped.endswith((".", ",", ";"))
+
+
+def split_sections(text, max_words=350):
+    """Yield (heading, body) pairs; long sections are windowed at line boundaries."""
+    heading = None
+    lines = []
+    previous_blank = True
+
+    def flush():
+        words = 0
+        window = []
+        for line in lines:
+            window.append(line)
+            words += len(line.split())
+            if words >= max_words:
+                yield heading, "\n".join(window).strip()
+                window, words = [], 0
+        if any(l.strip() for l in window):
+            yield heading, "\n".join(window).strip()
+
+    for line in text.splitlines():
+        if _is_heading(line, previous_blank):
+            yield from flush()
+            heading = line.strip().lstrip("#").strip()
+            lines = []
+        elif line.strip():
+            lines.append(line.rstrip())
+        previous_blank = not line.strip()
+    yield from flush()
+
+
+def _source_files(data_dir):
+    return sorted(
+        os.path.join(data_dir, name)
+        for name in os.listdir(data_dir)
+        if name.lower().endswith((".txt", ".md"))
+    )
+
+
+def _signature(files):
+    return [[os.path.basename(path), os.path.getsize(path), int(os.path.getmtime(path))] for path in files]
+
+
+def _index_file(index_dir, name, generation):
+    # "postings.bin" -> "postings.<generation>.bin"
+    stem, ext = os.path.splitext(name)
+    return os.path.join(index_dir, f"{stem}.{generation}{ext}")
+
+
+def _prune(index_dir, keep, min_age=600):
+    # Remove superseded generations once they are old enough that no reader is still opening them
+    now = time.time()
+    for name in os.listdir(index_dir):
+        match = GENERATION_FILE.match(name)
+        if not match or match.group("generation") in keep:
+            continue
+        path = os.path.join(index_dir, name)
+        try:
+            if now - os.path.getmtime(path) > min_age:
+                os.remove(path)
+        except OSError:
+            pass
+
+
+def build_index(data_dir=DATA_DIR, index_dir=INDEX_DIR):
+    files = _source_files(data_dir)
+    postings = {}
+    doc_lengths = array("I")
+    section_offsets = array("I")
+    generation = f"{int(time.time() * 1000)}-{os.getpid()}-{threading.get_ident()}"
+    sections_path = _index_file(index_dir, "sections.jsonl", generation)
+    os.makedirs(index_dir, exist_ok=True)
+
+    with open(sections_path, "wb") as sections_file:
+        for path in files:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                text = f.read()
+            for heading, body in split_sections(text):
+                doc_id = len(doc_lengths)
+                tokens = tokenize(f"{heading or ''}\n{body}")
+                counts = {}
+                for token in tokens:
+                    counts[token] = counts.get(token, 0) + 1
+                for token, tf in counts.items():
+                    postings.setdefault(token, []).append((doc_id, tf))
+                doc_lengths.append(len(tokens))
+                section_offsets.append(sections_file.tell())
+                record = {"source": os.path.basename(path), "heading": heading, "text": body}
+                sections_file.write((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+
+    # Flat postings: per term, df pairs of (doc_id, tf)
+    flat = array("I")
+    vocabulary = {}
+    for token in sorted(postings):
+        entries = postings[token]
+        vocabulary[token] = [len(flat), len(entries)]
+        for doc_id, tf in entries:
+            flat.append(doc_id)
+            flat.append(tf)
+
+    for name, values in (("postings.bin", flat), ("doclens.bin", doc_lengths), ("offsets.bin", section_offsets)):
+        with open(_index_file(index_dir, name, generation), "wb") as f:
+            values.tofile(f)
+
+    meta = {
+        "version": INDEX_VERSION,
+        "generation": generation,
+        "byteorder": sys.byteorder,
+        "sources": _signature(files),
+        "documents": len(doc_lengths),
+        "avg_length": (sum(doc_lengths) / len(doc_lengths)) if doc_lengths else 0.0,
+        "vocabulary": vocabulary,
+    }
+    # Publish: readers only ever see a meta.json whose generation files are complete
+    meta_path = os.path.join(index_dir, "meta.json")
+    tmp_path = f"{meta_path}.{generation}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, meta_path)
+    _prune(index_dir, keep={generation})
+    return meta
+
+
+def _mapped_uint32(path):
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None, memoryview(b"").cast("I")
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return mapped, memoryview(mapped).cast("I")
+
+
+class CorpusIndex:
+    def __init__(self, index_dir, meta):
+        self.index_dir = index_dir
+        self.generation = meta["generation"]
+        self.vocabulary = meta["vocabulary"]
+        self.documents = meta["documents"]
+        self.avg_length = meta["avg_length"] or 1.0
+        self._maps = []
+        self.postings = self._map("postings.bin")
+        self.doc_lengths = self._map("doclens.bin")
+        self.offsets = self._map("offsets.bin")
+        with open(_index_file(index_dir, "sections.jsonl", self.generation), "rb") as f:
+            self._sections = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if self.documents else b""
+
+    def _map(self, name):
+        mapped, view = _mapped_uint32(_index_file(self.index_dir, name, self.generation))
+        self._maps.append(mapped)
+        return view
+
+    @classmethod
+    def open(cls, data_dir=DATA_DIR, index_dir=INDEX_DIR):
+        """Load the index, rebuilding it first if data/ changed or it was never built."""
+        meta = None
+        try:
+            with open(os.path.join(index_dir, "meta.json"), encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            pass
+        files = _source_files(data_dir)
+        if (
+            meta is None
+            or meta.get("version") != INDEX_VERSION
+            or meta.get("byteorder") != sys.byteorder
+            or meta.get("sources") != _signature(files)
+        ):
+            meta = build_index(data_dir, index_dir)
+        try:
+            return cls(index_dir, meta)
+        except OSError:
+            # The generation was pruned between reading meta.json and opening its files
+            return cls(index_dir, build_index(data_dir, index_dir))
+
+    def section(self, doc_id):
+        start = self.offsets[doc_id]
+        end = self._sections.find(b"\n", start)
+        return json.loads(self._sections[start:end])
+
+    def search(self, query, top_k=5, k1=1.5, b=0.75):
+        scores = {}
+        for token in set(tokenize(query)):
+            entry = self.vocabulary.get(token)
+            if entry is None:
+                continue
+            start, df = entry
+            idf = math.log(1 + (self.documents - df + 0.5) / (df + 0.5))
+            for i in range(start, start + 2 * df, 2):
+                doc_id, tf = self.postings[i], self.postings[i + 1]
+                norm = k1 * (1 - b + b * self.doc_lengths[doc_id] / self.avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (k1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+        return [dict(self.section(doc_id), score=round(score, 3), id=doc_id) for doc_id, score in ranked]
+
+    def close(self):
+        for view in (self.postings, self.doc_lengths, self.offsets):
+            view.release()
+        for mapped in self._maps:
+            if mapped is not None:
+                mapped.close()
+        if self.documents:
+            self._sections.close()
+
+
+if __name__ == "__main__":
+    built = build_index()
+    print(f"Indexed {built['documents']} sections, {len(built['vocabulary'])} terms -> {INDEX_DIR}")
@@ -0,0 +1,46 @@
+from typing import Type
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+from corpus_index import CorpusIndex
+import threading
+
+# One index per process, opened on first search
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = CorpusIndex.open()
+        return _index
+
+
+class CorpusSearchInput(BaseModel):
+    """Input schema for CorpusSearchTool."""
+    query: str = Field(..., description="What to look up in the internal knowledge base.")
+    top_k: int = Field(5, description="Number of sections to return.")
+
+
+class CorpusSearchTool(BaseTool):
+    name: str = "Internal Corpus Search"
+    description: str = (
+        "Searches the team's internal data science notes (the local data/ corpus) and returns the most "
+        "relevant sections with their source. It is local and free, so use it before web search."
+    )
+    args_schema: Type[BaseModel] = CorpusSearchInput
+
+    def _run(self, query: str, top_k: int = 5) -> str:
+        try:
+            results = get_index().search(query, top_k=max(1, min(int(top_k), 20)))
+        except Exception as e:
+            return f"⚠️ Failed to search internal corpus: {str(e)}"
+        if not results:
+            return "No matching sections in the internal corpus."
+
+        sections = []
+        for result in results:
+            heading = result["heading"] or "(untitled section)"
+            sections.append(f"### {heading}\nSource: data/{result['source']} (score {result['score']})\n\n{result['text']}")
+        return "\n\n".join(sections)
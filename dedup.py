@@ -0,0 +1,129 @@
+# dedup.py
+
+import re
+import zlib
+import numpy as np
+from content_chunker import SECTION_BOUNDARY, estimate_tokens
+
+_MERSENNE = np.uint64((1 << 61) - 1)
+_WORD = re.compile(r"\w+")
+
+
+class NearDuplicateFilter:
+    """Streaming MinHash + LSH filter: is_duplicate(text) is True when an earlier text is similar.
+
+    Texts are shingled into word n-grams; two texts count as near-duplicates when the estimated
+    Jaccard similarity of their shingle sets reaches threshold. LSH banding means each text is
+    only compared with texts that share a band, so filtering n texts stays linear in their size.
+    """
+
+    def __init__(self, threshold=0.8, shingle_words=5, num_perm=64, bands=16, min_words=8, seed=7):
+        self.threshold = threshold
+        self.shingle_words = shingle_words
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.min_words = min_words
+        rng = np.random.default_rng(seed)
+        # 31-bit coefficients: a*x + b stays below 2**64 for 32-bit shingle hashes
+        self._a = rng.integers(1, 1 << 31, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 31, size=num_perm, dtype=np.uint64)
+        self._buckets = {}  # (band, band hash) -> signature indexes
+        self._signatures = []
+        self._exact = set()
+
+    def signature(self, words):
+        n = self.shingle_words
+        shingles = {" ".join(words[i:i + n]) for i in range(max(1, len(words) - n + 1))}
+        hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+        # One universal hash (a*x + b) mod p per permutation, minimized over the shingles
+        return ((self._a[:, None] * hashes[None, :] + self._b[:, None]) % _MERSENNE).min(axis=1)
+
+    def is_duplicate(self, text):
+        words = _WORD.findall(text.lower())
+        if len(words) < self.min_words:
+            return False  # headings, labels and URLs repeat legitimately
+        fingerprint = " ".join(words)
+        if fingerprint in self._exact:
+            return True
+        self._exact.add(fingerprint)
+
+        signature = self.signature(words)
+        keys = [(band, signature[band * self.rows:(band + 1) * self.rows].tobytes()) for band in range(self.bands)]
+        candidates = {index for key in keys for index in self._buckets.get(key, ())}
+        for index in candidates:
+            if np.mean(self._signatures[index] == signature) >= self.threshold:
+                return True
+
+        index = len(self._signatures)
+        self._signatures.append(signature)
+        for key in keys:
+            self._buckets.setdefault(key, []).append(index)
+        return False
+
+
+def _records(text):
+    # Same boundaries as content_chunker.split_sections, but lossless: "".join(records) == text
+    records = []
+    current = []
+    for line in text.splitlines(keepends=True):
+        if SECTION_BOUNDARY.match(line) and any(l.strip() for l in current):
+            records.append("".join(current))
+            current = []
+        current.append(line)
+    if current:
+        records.append("".join(current))
+    return records
+
+
+def _dedupe_paragraphs(record, paragraph_filter):
+    # Drop repeated paragraph bodies; leading "Source:"/"URL:"/heading lines stay with the record
+    parts = re.split(r"(\n\s*\n)", record)
+    kept = []
+    dropped = 0
+    for i in range(0, len(parts), 2):
+        lines = parts[i].split("\n")
+        header = 0
+        while header < len(lines) and SECTION_BOUNDARY.match(lines[header]):
+            header += 1
+        body = "\n".join(lines[header:])
+        if body.strip() and paragraph_filter.is_duplicate(body):
+            dropped += 1
+            if not header:
+                continue
+            parts[i] = "\n".join(lines[:header])
+        kept.append(parts[i] + (parts[i + 1] if i + 1 < len(parts) else ""))
+    return "".join(kept), dropped
+
+
+def dedupe_content(raw_content, threshold=0.8):
+    """Drop near-duplicate source records, then near-duplicate paragraphs across the kept records.
+
+    Returns (deduplicated text, stats). The first occurrence wins and untouched text keeps its
+    original formatting, so source order and labels are preserved.
+    """
+    records = _records(raw_content)
+    record_filter = NearDuplicateFilter(threshold=threshold)
+    paragraph_filter = NearDuplicateFilter(threshold=threshold)
+    kept = []
+    dropped_records = 0
+    dropped_paragraphs = 0
+
+    for record in records:
+        if record_filter.is_duplicate(record):
+            dropped_records += 1
+            continue
+        # Overlapping transcript passages and syndicated excerpts show up as repeated paragraphs
+        record, dropped = _dedupe_paragraphs(record, paragraph_filter)
+        dropped_paragraphs += dropped
+        kept.append(record)
+
+    deduped = "".join(kept)
+    before = len(raw_content.encode("utf-8"))
+    after = len(deduped.encode("utf-8"))
+    return deduped, {
+        "records": len(records),
+        "records_dropped": dropped_records,
+        "paragraphs_dropped": dropped_paragraphs,
+        "bytes_saved": before - after,
+        "tokens_saved": estimate_tokens(raw_content) - estimate_tokens(deduped),
+    }
@@ -0,0 +1,106 @@
+# factory.py
+#
+# Lazy construction of the heavy pieces shared by the entry points. Nothing here imports CrewAI,
+# crewai_tools or AgentOps until something is actually built, so importing this module (and
+# module_tasks) is cheap and a process only pays for what its first stage needs.
+
+import os
+import threading
+
+DEFAULT_MODEL = "gpt-3.5-turbo"
+
+_lock = threading.RLock()
+_instances = {}
+_telemetry_started = False
+
+
+def _once(key, build):
+    # One shared instance per key and process
+    with _lock:
+        if key not in _instances:
+            _instances[key] = build()
+        return _instances[key]
+
+
+def get_llm(model=DEFAULT_MODEL, **options):
+    def build():
+        from crewai import LLM
+        return LLM(model=model, api_key=os.getenv("OPENAI_API_KEY"), **options)
+
+    return _once(("llm", model, tuple(sorted(options.items()))), build)
+
+
+def get_search_tool(n_results=10):
+    def build():
+        from cached_search_tool import CachedSerperDevTool
+        return CachedSerperDevTool(n_results=n_results)
+
+    return _once(("search_tool", n_results), build)
+
+
+def get_corpus_tool():
+    def build():
+        from corpus_tool import CorpusSearchTool
+        return CorpusSearchTool()
+
+    return _once(("corpus_tool",), build)
+
+
+def get_youtube_tool():
+    def build():
+        from youtube_tool import YouTubeTranscriptTool
+        return YouTubeTranscriptTool()
+
+    return _once(("youtube_tool",), build)
+
+
+def init_telemetry(api_key=None, background=True):
+    """Start AgentOps once per process, off the critical path unless background=False."""
+    global _telemetry_started
+    api_key = api_key or os.getenv("AGENTOPS_API_KEY")
+    with _lock:
+        if _telemetry_started or not api_key:
+            return False
+        _telemetry_started = True
+
+    def start():
+        try:
+            import agentops
+            agentops.init(api_key=api_key)
+        except Exception as e:
+            print(f"⚠️ Telemetry not started: {e}")
+
+    if background:
+        threading.Thread(target=start, name="telemetry-init", daemon=True).start()
+    else:
+        start()
+    return True
+
+
+class LazyTask:
+    """Stands in for a CrewAI Task (and its agent) until the task is first used.
+
+    Attribute access builds the real task; pass the proxy through materialize() before handing it
+    to CrewAI, which validates that it received a genuine Task.
+    """
+
+    def __init__(self, build):
+        self._build = build
+        self._task = None
+        self._task_lock = threading.Lock()
+
+    def materialize(self):
+        with self._task_lock:
+            if self._task is None:
+                self._task = self._build()
+            return self._task
+
+    def __getattr__(self, name):
+        # Only called for attributes the proxy itself does not have
+        if name.startswith("_"):
+            raise AttributeError(name)  # copy/pickle probes before __init__ ran
+        return getattr(self.materialize(), name)
+
+
+def materialize(task):
+    return task.materialize() if isinstance(task, LazyTask) else task
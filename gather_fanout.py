@@ -0,0 +1,118 @@
+# gather_fanout.py
+
+import json
+import re
+import threading
+import time
+from concurrent.futures import Future, wait
+from factory import get_corpus_tool, get_search_tool, get_youtube_tool
+
+OK, EMPTY, TIMEOUT, ERROR = "ok", "empty", "timeout", "error"
+
+YOUTUBE_URL = re.compile(r"https?://(?:www\.|m\.)?(?:youtube\.com/watch\?v=|youtu\.be/)([0-9A-Za-z_-]{11})")
+
+
+class Source:
+    """One gatherer: fetch(topic) -> text, abandoned if it has not answered within budget_seconds."""
+
+    def __init__(self, name, fetch, budget_seconds=30):
+        self.name = name
+        self.fetch = fetch
+        self.budget_seconds = budget_seconds
+
+
+def format_search_results(result):
+    # Serper returns a dict (organic results, people also ask, ...) in newer crewai_tools releases
+    if isinstance(result, str):
+        return result
+    if isinstance(result, dict) and result.get("organic"):
+        return "\n\n".join(
+            f"### {item.get('title', '').strip()}\nURL: {item.get('link', '')}\n{item.get('snippet', '').strip()}"
+            for item in result["organic"]
+        )
+    return json.dumps(result, ensure_ascii=False, indent=1, default=str)
+
+
+def web_search(topic, n_results=10):
+    return format_search_results(get_search_tool(n_results=n_results).run(search_query=topic))
+
+
+def youtube_transcripts(topic, max_videos=3):
+    # Find videos with a site-restricted web search, then fetch their transcripts in one batch
+    results = get_search_tool(n_results=10).run(search_query=f"{topic} site:youtube.com")
+    video_ids = list(dict.fromkeys(YOUTUBE_URL.findall(json.dumps(results, default=str))))[:max_videos]
+    if not video_ids:
+        return ""
+    return get_youtube_tool().run(video_urls=[f"https://www.youtube.com/watch?v={video_id}" for video_id in video_ids])
+
+
+def corpus_search(topic, top_k=5):
+    return get_corpus_tool().run(query=topic, top_k=top_k)
+
+
+def default_sources(web_budget=20, youtube_budget=45, corpus_budget=5):
+    return [
+        Source("web search", web_search, web_budget),
+        Source("youtube transcripts", youtube_transcripts, youtube_budget),
+        Source("internal corpus", corpus_search, corpus_budget),
+    ]
+
+
+class FanOutGatherer:
+    """Runs every source concurrently and merges what came back in time into one tagged raw_content.
+
+    Gather latency is that of the slowest source still inside its budget, not the sum of all of
+    them. Each source's text is wrapped in a "## Source: <name>" section, in the order the sources
+    were given, so the dedup and chunking steps downstream treat it as its own record.
+    """
+
+    def __init__(self, sources=None, min_chars=50):
+        self.sources = list(sources) if sources is not None else default_sources()
+        self.min_chars = min_chars
+
+    def _call(self, source, topic):
+        # (text, seconds, error); failures are returned rather than raised so their timing is kept
+        started = time.perf_counter()
+        try:
+            return source.fetch(topic), time.perf_counter() - started, None
+        except Exception as e:
+            return None, time.perf_counter() - started, e
+
+    def _start(self, source, topic):
+        # A daemon thread per source: one still running past its budget never holds up interpreter
+        # exit the way a ThreadPoolExecutor worker would
+        future = Future()
+        threading.Thread(target=lambda: future.set_result(self._call(source, topic)),
+                         name=f"gather-{source.name}", daemon=True).start()
+        return future
+
+    def gather(self, topic):
+        """Returns (merged text or None when no source produced anything, per-source report)."""
+        started = time.perf_counter()
+        futures = [self._start(source, topic) for source in self.sources]
+        report = []
+        sections = []
+        for source, future in zip(self.sources, futures):
+            # Budgets run from the shared start, so waiting on one source never extends another's
+            remaining = source.budget_seconds - (time.perf_counter() - started)
+            wait([future], timeout=max(0.0, remaining))
+            entry = {"source": source.name, "chars": 0}
+            if not future.done():
+                entry.update(status=TIMEOUT, seconds=round(time.perf_counter() - started, 2))
+                report.append(entry)
+                continue
+            text, seconds, error = future.result()
+            entry["seconds"] = round(seconds, 2)
+            if error is not None:
+                entry.update(status=ERROR, error=str(error))
+            else:
+                text = text if isinstance(text, str) else format_search_results(text)
+                if text.lstrip().startswith("⚠️"):  # the tools report failures as text
+                    entry.update(status=ERROR, error=text.strip()[:200])
+                elif len(text.strip()) < self.min_chars:
+                    entry["status"] = EMPTY
+                else:
+                    entry.update(status=OK, chars=len(text))
+                    sections.append(f"## Source: {source.name}\n\n{text.strip()}\n")
+            report.append(entry)
+        return ("\n".join(sections) if sections else None), report
@@ -0,0 +1,161 @@
+# job_queue.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    key TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL,
+    stage TEXT,
+    result TEXT,
+    error TEXT,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_key_status ON jobs (key, status);
+"""
+
+
+def job_key(topic, params):
+    # Same topic (ignoring case/whitespace) with the same settings is the same job
+    payload = [" ".join(str(topic).lower().split()), {k: params[k] for k in sorted(params)}]
+    return hashlib.sha256(json.dumps(payload, default=str).encode("utf-8")).hexdigest()
+
+
+class JobStore:
+    """Job records in SQLite, so submitted jobs and their results survive reruns and restarts."""
+
+    def __init__(self, db_path=".cache/jobs.sqlite3"):
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def create(self, key, topic, params):
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, key, topic, params, status, created) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, key, topic, json.dumps(params), QUEUED, time.time()),
+            )
+            self._conn.commit()
+        return job_id
+
+    def update(self, job_id, **fields):
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", [*fields.values(), job_id])
+            self._conn.commit()
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["params"] = json.loads(job["params"])
+        return job
+
+    def find_active(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id FROM jobs WHERE key = ? AND status IN (?, ?) ORDER BY created LIMIT 1", (key, QUEUED, RUNNING)
+            ).fetchone()
+        return row["id"] if row else None
+
+    def active(self):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM jobs WHERE status IN (?, ?) ORDER BY created", (QUEUED, RUNNING)
+            ).fetchall()
+        return [row["id"] for row in rows]
+
+
+class JobQueue:
+    """Runs run_job(topic, on_event, **params) on a worker pool; callers submit and poll by job id.
+
+    Submitting a topic that is already queued or running returns the existing job instead of
+    starting a second one. Progress events and streamed tokens are kept in memory per job for
+    polling; status, current stage and the result are persisted in the JobStore. Jobs left queued
+    or running by a previous process are resubmitted on start-up.
+    """
+
+    def __init__(self, run_job, store=None, max_workers=4, max_events=200):
+        self.run_job = run_job
+        self.store = store or JobStore()
+        self.max_events = max_events
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job-worker")
+        self._lock = threading.Lock()  # find-or-create atomicity and live progress state
+        self._live = {}  # job id -> {"events": deque, "partial": str}
+        for job_id in self.store.active():
+            self._enqueue(job_id)
+
+    def submit(self, topic, **params):
+        key = job_key(topic, params)
+        with self._lock:
+            job_id = self.store.find_active(key)
+            if job_id is not None:
+                return job_id
+            job_id = self.store.create(key, topic, params)
+            self._enqueue(job_id)
+        return job_id
+
+    def _enqueue(self, job_id):
+        self._live[job_id] = {"events": deque(maxlen=self.max_events), "partial": ""}
+        self._pool.submit(self._run, job_id)
+
+    def _on_event(self, job_id, kind, payload):
+        live = self._live.get(job_id)
+        if live is None:
+            return
+        with self._lock:
+            if kind == "token":
+                live["partial"] += payload
+                return
+            live["events"].append((time.time(), kind, payload))
+            if kind == "stage_start":
+                live["partial"] = ""
+        if kind == "stage_start":
+            self.store.update(job_id, stage=payload.get("agent"))
+
+    def _run(self, job_id):
+        job = self.store.get(job_id)
+        if job is None:
+            return
+        self.store.update(job_id, status=RUNNING, started=time.time())
+        try:
+            result = self.run_job(job["topic"], lambda kind, payload: self._on_event(job_id, kind, payload), **job["params"])
+            self.store.update(job_id, status=DONE, result=str(result), stage=None, finished=time.time())
+        except Exception as e:
+            self.store.update(job_id, status=FAILED, error=f"{e}\n\n{traceback.format_exc()}", finished=time.time())
+        finally:
+            self._live.pop(job_id, None)  # the persisted record now holds everything a poller needs
+
+    def get(self, job_id):
+        job = self.store.get(job_id)
+        if job is None:
+            return None
+        with self._lock:
+            live = self._live.get(job_id)
+            job["events"] = list(live["events"]) if live else []
+            job["partial"] = live["partial"] if live else ""
+        return job
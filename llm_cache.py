@@ -0,0 +1,115 @@
+# llm_cache.py
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+
+class LLMResultCache:
+    """Disk-backed cache of task outputs keyed on a content hash of the task and its inputs."""
+
+    def __init__(self, cache_dir=".cache/llm_results", max_entries=500, ttl_seconds=7 * 24 * 3600):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def _normalize(value):
+        # Strip incidental whitespace and sort keys so equivalent inputs hash identically
+        if isinstance(value, str):
+            return " ".join(value.split())
+        if isinstance(value, dict):
+            return {str(k): LLMResultCache._normalize(v) for k, v in sorted(value.items(), key=lambda kv: str(kv[0]))}
+        if isinstance(value, (list, tuple)):
+            return [LLMResultCache._normalize(v) for v in value]
+        if value is None or isinstance(value, (int, float, bool)):
+            return value
+        return str(value)
+
+    @staticmethod
+    def model_name(task):
+        llm = getattr(task.agent, "llm", None)
+        model = getattr(llm, "model", None) or getattr(llm, "model_name", None)
+        return str(model) if model else str(llm)
+
+    def make_key(self, task, input_data):
+        payload = {
+            "role": task.agent.role,
+            "description": task.description,
+            "expected_output": task.expected_output,
+            "model": self.model_name(task),
+            "inputs": self._normalize(input_data),
+        }
+        blob = json.dumps(self._normalize(payload), sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key):
+        path = self._path(key)
+        with self._lock:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                self.misses += 1
+                return None
+
+            if self.ttl_seconds and time.time() - entry.get("created", 0) > self.ttl_seconds:
+                self._remove(path)
+                self.misses += 1
+                return None
+
+            # Touch the file so size-based eviction drops the least recently used entries
+            try:
+                os.utime(path, None)
+            except OSError:
+                pass
+            self.hits += 1
+            return entry.get("output")
+
+    def set(self, key, output):
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with self._lock:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"created": time.time(), "output": output}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+            self._evict()
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _evict(self):
+        entries = []
+        now = time.time()
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if self.ttl_seconds and now - stat.st_mtime > self.ttl_seconds:
+                self._remove(path)
+                continue
+            entries.append((stat.st_mtime, path))
+
+        if self.max_entries and len(entries) > self.max_entries:
+            entries.sort()
+            for _, path in entries[: len(entries) - self.max_entries]:
+                self._remove(path)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
@@ -0,0 +1,167 @@
+# log_sink.py
+
+import atexit
+import json
+import os
+import queue
+import re
+import reprlib
+import threading
+import time
+from collections import deque
+
+DEBUG, INFO, WARNING, ERROR = 10, 20, 30, 40
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+
+# Default level for the status strings the orchestrators log
+STATUS_LEVELS = {
+    "Input": DEBUG,
+    "Output": DEBUG,
+    "Warning": WARNING,
+    "Fallback": WARNING,
+    "Backoff": WARNING,
+    "Error": ERROR,
+    "Traceback": ERROR,
+    "Failed": ERROR,
+}
+
+
+CONTAINERS = (dict, list, tuple, set, frozenset)
+
+
+def bounded_repr(value, max_chars):
+    # reprlib stops after a few elements and levels, so a huge memory list is never fully rendered;
+    # other objects still go through their own __str__
+    limits = reprlib.Repr()
+    limits.maxstring = limits.maxother = max_chars
+    limits.maxlevel = 3
+    limits.maxdict = limits.maxlist = limits.maxtuple = limits.maxset = limits.maxfrozenset = 20
+    return limits.repr(value)
+
+
+def truncate(value, max_chars, keep="head"):
+    if isinstance(value, str):
+        text = value
+    elif max_chars is not None and isinstance(value, CONTAINERS):
+        text = bounded_repr(value, max_chars)
+    else:
+        text = str(value)
+    if max_chars is None or len(text) <= max_chars:
+        return text
+    dropped = len(text) - max_chars
+    if keep == "tail":
+        return f"[{dropped} chars truncated] …{text[-max_chars:]}"
+    return f"{text[:max_chars]}… [+{dropped} chars]"
+
+
+def summarize_detail(detail, max_chars):
+    # Dicts (e.g. stage inputs carrying memory) are truncated per field; container fields are rendered
+    # with bounded_repr rather than stringified whole
+    if isinstance(detail, dict):
+        return {str(k): truncate(v, max_chars) for k, v in detail.items()}
+    return truncate(detail, max_chars)
+
+
+class _JsonlWriter:
+    """One background thread serializing records to JSONL files for every LogSink in the process."""
+
+    def __init__(self, max_queue=10000):
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.dropped = 0
+        self._files = {}
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, path, record):
+        try:
+            self.queue.put_nowait((path, record))
+        except queue.Full:
+            # Never block the pipeline on log I/O; count what we had to drop
+            self.dropped += 1
+
+    def close_file(self, path):
+        self.queue.put((path, None))
+
+    def flush(self):
+        self.queue.join()
+
+    def _run(self):
+        while True:
+            path, record = self.queue.get()
+            try:
+                if record is None:
+                    handle = self._files.pop(path, None)
+                    if handle:
+                        handle.close()
+                    continue
+                handle = self._files.get(path)
+                if handle is None:
+                    if os.path.dirname(path):
+                        os.makedirs(os.path.dirname(path), exist_ok=True)
+                    handle = self._files[path] = open(path, "a", encoding="utf-8")
+                handle.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+                if self.queue.empty():
+                    handle.flush()
+            except Exception:
+                pass
+            finally:
+                self.queue.task_done()
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = _JsonlWriter()
+            atexit.register(_writer.flush)
+        return _writer
+
+
+class LogSink:
+    """Leveled, truncating log sink: ring buffer for get_logs(), JSONL file via a background writer."""
+
+    def __init__(self, name="orchestrator", log_dir="logs", buffer_size=2000, max_field_chars=2000,
+                 console_level=INFO, file_level=DEBUG, console_chars=300):
+        self.buffer = deque(maxlen=buffer_size)
+        self.max_field_chars = max_field_chars
+        self.console_level = console_level
+        self.file_level = file_level
+        self.console_chars = console_chars
+        self.path = None
+        if log_dir:
+            slug = re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_") or "run"
+            self.path = os.path.join(log_dir, f"{time.strftime('%Y%m%d-%H%M%S')}_{slug}_{os.getpid()}_{id(self):x}.jsonl")
+
+    def log(self, step, status, detail="", level=None):
+        level = level if level is not None else STATUS_LEVELS.get(status, INFO)
+        timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
+        entry = {
+            "timestamp": timestamp,
+            "level": LEVEL_NAMES.get(level, str(level)),
+            "step": step,
+            "status": status,
+            "detail": summarize_detail(detail, self.max_field_chars) if status != "Traceback"
+            else truncate(detail, self.max_field_chars, keep="tail"),
+        }
+        self.buffer.append(entry)
+        if self.path and level >= self.file_level:
+            get_writer().submit(self.path, entry)
+        if level >= self.console_level:
+            print(f"[{timestamp}] [{step}] [{status}] {truncate(entry['detail'], self.console_chars)}")
+        return entry
+
+    def get_logs(self):
+        return list(self.buffer)
+
+    def flush(self):
+        if self.path:
+            get_writer().flush()
+
+    def close(self):
+        # Queued behind this sink's records, so nothing is lost; call flush() to wait for the disk
+        if self.path:
+            get_writer().close_file(self.path)
@@ -1,10 +1,46 @@
 # memory_layer.py
 
+from content_chunker import estimate_tokens
+
+
+class MemoryPolicy:
+    """Which memory a stage receives.
+
+    last_k keeps only the newest k matching entries in full, steps restricts entries to the given
+    step names, and token_budget caps the injected size. Entries that do not make the cut are
+    replaced by a short summary when summarize_older is set, otherwise dropped.
+    """
+
+    def __init__(self, last_k=None, steps=None, token_budget=None, summarize_older=True, summary_chars=240):
+        self.last_k = last_k
+        self.steps = set(steps) if steps else None
+        self.token_budget = token_budget
+        self.summarize_older = summarize_older
+        self.summary_chars = summary_chars
+
+
+def summarize(content, max_chars=240):
+    # Cheap local summary: leading text up to max_chars, cut at a sentence or word boundary.
+    # Only a bounded prefix is normalized, so summarizing huge outputs stays cheap.
+    text = " ".join(str(content)[: max_chars * 4].split())
+    if len(text) <= max_chars:
+        return text
+    head = text[:max_chars]
+    cut = max(head.rfind(". "), head.rfind("! "), head.rfind("? "))
+    if cut < max_chars // 2:
+        cut = head.rfind(" ")
+    return head[: cut + 1 if cut > 0 else max_chars].rstrip() + " …"
+
+
 class MemoryLayer:
-    def __init__(self):
+    def __init__(self, default_policy=None):
         self.history = []  # list of memory items
+        self._by_step = {}  # step name -> indexes into history, oldest first
+        self.default_policy = default_policy  # None injects the full history
+        self.policies = {}  # consuming step name -> MemoryPolicy
 
     def remember(self, step_name, content):
+        self._by_step.setdefault(step_name, []).append(len(self.history))
         self.history.append({
             "step": step_name,
             "content": content
@@ -13,13 +49,58 @@ class MemoryLayer:
     def get_history(self):
         return self.history
 
+    def restore(self, history):
+        # Replace the current history (e.g. from a checkpoint) and rebuild the per-step index
+        self.history = []
+        self._by_step = {}
+        for item in history:
+            MemoryLayer.remember(self, item["step"], item["content"])
+        return self.history
+
     def get_last(self, step_name=None):
         if step_name:
-            for item in reversed(self.history):
-                if item["step"] == step_name:
-                    return item["content"]
+            indexes = self._by_step.get(step_name)
+            return self.history[indexes[-1]]["content"] if indexes else None
         return self.history[-1]["content"] if self.history else None
 
-    def inject_memory(self, input_data):
-        input_data["memory"] = self.history
+    def set_policy(self, step_name, policy):
+        self.policies[step_name] = policy
+
+    def select(self, policy):
+        if policy is None:
+            return list(self.history)
+
+        if policy.steps is None:
+            candidates = self.history
+        else:
+            indexes = sorted(i for step in policy.steps for i in self._by_step.get(step, []))
+            candidates = [self.history[i] for i in indexes]
+
+        keep_full = len(candidates) if policy.last_k is None else policy.last_k
+        budget = policy.token_budget
+        used = 0
+        selected = []
+
+        # Walk newest first so the most recent outputs win the budget
+        for position, item in enumerate(reversed(candidates)):
+            content = str(item["content"])
+            if position < keep_full:
+                cost = estimate_tokens(content)
+                if budget is None or used + cost <= budget:
+                    selected.append({"step": item["step"], "content": item["content"]})
+                    used += cost
+                    continue
+            if policy.summarize_older:
+                summary = summarize(content, policy.summary_chars)
+                cost = estimate_tokens(summary)
+                if budget is None or used + cost <= budget:
+                    selected.append({"step": item["step"], "content": summary, "summarized": True})
+                    used += cost
+
+        selected.reverse()
+        return selected
+
+    def inject_memory(self, input_data, step_name=None):
+        policy = self.policies.get(step_name, self.default_policy)
+        input_data["memory"] = self.select(policy)
         return input_data
@@ -0,0 +1,240 @@
+# metrics.py
+
+import json
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LATENCY_BUCKETS = (0.5, 1, 2, 5, 10, 20, 30, 60, 120, 300, float("inf"))
+
+# USD per 1K (prompt, completion) tokens; matched on the longest model-name prefix
+MODEL_PRICES = {
+    "gpt-3.5-turbo": (0.0005, 0.0015),
+    "gpt-4o-mini": (0.00015, 0.0006),
+    "gpt-4o": (0.0025, 0.01),
+    "gpt-4-turbo": (0.01, 0.03),
+    "gpt-4": (0.03, 0.06),
+}
+
+
+def stage_cost(model, prompt_tokens, completion_tokens):
+    name = str(model or "").split("/")[-1]
+    matches = [m for m in MODEL_PRICES if name.startswith(m)]
+    if not matches:
+        return 0.0
+    prompt_price, completion_price = MODEL_PRICES[max(matches, key=len)]
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1000
+
+
+def extract_usage(result, crew=None):
+    # CrewOutput.token_usage on recent CrewAI, Crew.usage_metrics on older releases
+    usage = getattr(result, "token_usage", None) or getattr(crew, "usage_metrics", None)
+    if usage is None:
+        return 0, 0
+
+    def field(name):
+        value = usage.get(name, 0) if isinstance(usage, dict) else getattr(usage, name, 0)
+        return int(value or 0)
+
+    return field("prompt_tokens"), field("completion_tokens")
+
+
+class MetricsRegistry:
+    """Process-wide counters and latency histograms, labelled by agent role."""
+
+    COUNTERS = {
+        "attempts": "Task attempts started",
+        "retries": "Task attempts after the first",
+        "errors": "Task attempts that raised",
+        "rate_limit_errors": "Attempts throttled by the provider or an open circuit",
+        "timeout_errors": "Attempts that timed out",
+        "validation_errors": "Attempts with empty or insufficient output",
+        "fatal_errors": "Attempts that failed with a non-retryable error",
+        "backoff_seconds": "Time spent backing off between attempts",
+        "failures": "Tasks that exhausted their retries",
+        "successes": "Tasks that produced accepted output",
+        "cache_hits": "Tasks served from the LLM result cache",
+        "prompt_tokens": "Prompt tokens consumed",
+        "completion_tokens": "Completion tokens produced",
+        "cost_usd": "Estimated model cost in USD",
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {name: {} for name in self.COUNTERS}
+        self.latency = {}  # role -> [bucket counts..., sum, count]
+
+    def inc(self, name, role, amount=1):
+        with self._lock:
+            self.counters[name][role] = self.counters[name].get(role, 0) + amount
+
+    def observe_latency(self, role, seconds):
+        with self._lock:
+            series = self.latency.setdefault(role, [0] * len(LATENCY_BUCKETS) + [0.0, 0])
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    series[i] += 1
+            series[-2] += seconds
+            series[-1] += 1
+
+    @staticmethod
+    def _label(role):
+        return str(role).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+    def render_prometheus(self):
+        lines = []
+        with self._lock:
+            for name, help_text in self.COUNTERS.items():
+                metric = f"content_pipeline_{name}_total"
+                lines.append(f"# HELP {metric} {help_text}")
+                lines.append(f"# TYPE {metric} counter")
+                for role, value in sorted(self.counters[name].items()):
+                    lines.append(f'{metric}{{role="{self._label(role)}"}} {value}')
+
+            metric = "content_pipeline_stage_latency_seconds"
+            lines.append(f"# HELP {metric} Wall time of Crew.kickoff per attempt")
+            lines.append(f"# TYPE {metric} histogram")
+            for role, series in sorted(self.latency.items()):
+                label = self._label(role)
+                for bound, count in zip(LATENCY_BUCKETS, series):
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    lines.append(f'{metric}_bucket{{role="{label}",le="{le}"}} {count}')
+                lines.append(f'{metric}_sum{{role="{label}"}} {series[-2]:.6f}')
+                lines.append(f'{metric}_count{{role="{label}"}} {series[-1]}')
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+class RunMetrics:
+    """Per-run stage statistics; every update is mirrored into the process-wide registry."""
+
+    def __init__(self, topic, registry=registry):
+        self.topic = topic
+        self.registry = registry
+        self.started = time.time()
+        self.stages = {}
+        self._lock = threading.Lock()  # chunked refine updates stages from several threads
+
+    def _stage(self, role):
+        return self.stages.setdefault(role, {
+            "attempts": 0, "retries": 0, "errors": 0, "failures": 0, "successes": 0, "cache_hits": 0,
+            "rate_limit_errors": 0, "timeout_errors": 0, "validation_errors": 0, "fatal_errors": 0, "backoff_seconds": 0.0,
+            "latency_seconds": [], "prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0,
+        })
+
+    def _inc(self, role, name, amount=1):
+        with self._lock:
+            self._stage(role)[name] += amount
+        self.registry.inc(name, role, amount)
+
+    def attempt(self, role, attempt):
+        self._inc(role, "attempts")
+        if attempt > 0:
+            self._inc(role, "retries")
+
+    def observe(self, role, model, seconds, result=None, crew=None):
+        with self._lock:
+            self._stage(role)["latency_seconds"].append(round(seconds, 3))
+        self.registry.observe_latency(role, seconds)
+        prompt_tokens, completion_tokens = extract_usage(result, crew)
+        if prompt_tokens or completion_tokens:
+            self._inc(role, "prompt_tokens", prompt_tokens)
+            self._inc(role, "completion_tokens", completion_tokens)
+            self._inc(role, "cost_usd", stage_cost(model, prompt_tokens, completion_tokens))
+
+    def error(self, role, kind=None):
+        self._inc(role, "errors")
+        if kind and f"{kind}_errors" in self.registry.COUNTERS:
+            self._inc(role, f"{kind}_errors")
+
+    def backoff(self, role, seconds):
+        self._inc(role, "backoff_seconds", seconds)
+
+    def failure(self, role):
+        self._inc(role, "failures")
+
+    def success(self, role):
+        self._inc(role, "successes")
+
+    def cache_hit(self, role):
+        self._inc(role, "cache_hits")
+
+    def summary(self):
+        stages = {}
+        with self._lock:
+            snapshot = {role: dict(stats, latency_seconds=list(stats["latency_seconds"])) for role, stats in self.stages.items()}
+        for role, stats in snapshot.items():
+            latencies = stats["latency_seconds"]
+            stages[role] = dict(
+                stats,
+                total_seconds=round(sum(latencies), 3),
+                cost_usd=round(stats["cost_usd"], 6),
+                backoff_seconds=round(stats["backoff_seconds"], 3),
+            )
+        timed = [role for role in stages if stages[role]["total_seconds"] > 0]
+        slowest = max(timed, key=lambda r: stages[r]["total_seconds"]) if timed else None
+        return {
+            "topic": self.topic,
+            "wall_seconds": round(time.time() - self.started, 3),
+            "prompt_tokens": sum(s["prompt_tokens"] for s in stages.values()),
+            "completion_tokens": sum(s["completion_tokens"] for s in stages.values()),
+            "cost_usd": round(sum(s["cost_usd"] for s in stages.values()), 6),
+            "slowest_stage": slowest,
+            "stages": stages,
+        }
+
+    def report(self, log, metrics_dir="metrics"):
+        """Log the one-line run summary through log(step, status, detail) and write the JSON summary."""
+        summary = self.summary()
+        log("Orchestrator", "Metrics", (
+            f"📊 {summary['wall_seconds']:.1f}s wall, {summary['prompt_tokens']}+{summary['completion_tokens']} tokens, "
+            f"${summary['cost_usd']:.4f}, slowest stage: {summary['slowest_stage']}"
+        ))
+        try:
+            self.write_summary(metrics_dir)
+        except OSError as e:
+            log("Orchestrator", "Warning", f"Could not write metrics summary: {e}")
+        return summary
+
+    def write_summary(self, metrics_dir="metrics"):
+        os.makedirs(metrics_dir, exist_ok=True)
+        slug = re.sub(r"[^a-z0-9]+", "_", self.topic.lower()).strip("_") or "run"
+        path = os.path.join(metrics_dir, f"{time.strftime('%Y%m%d-%H%M%S')}_{slug}_{os.getpid()}_{id(self):x}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, indent=2)
+        return path
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = registry.render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port=None, host="127.0.0.1"):
+    """Serve the registry in Prometheus text format on http://host:port/metrics (once per process)."""
+    global _server
+    with _server_lock:
+        if _server is None:
+            port = int(port or os.getenv("METRICS_PORT", 9464))
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+        return _server
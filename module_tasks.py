@@ -0,0 +1,226 @@
+# module_tasks.py
+
+import functools
+from factory import LazyTask, get_corpus_tool, get_llm, get_search_tool
+
+
+def gather_stage(topic):
+    """Content Gatherer: internal corpus first, then cached web search."""
+    from crewai import Agent, Task
+
+    llm = get_llm()
+    content_gatherer = Agent(
+        role="Content Gatherer",
+        goal=f"Pull diverse structured and unstructured content on the topic: {topic}",
+        backstory=(
+            "You're an expert content miner specialized in gathering both structured and unstructured data "
+            "from reliable sources like blogs, YouTube transcripts, PDFs, forums, and documentation. "
+            "You prioritize diverse sources and extract relevant insights, examples, and terminology."
+        ),
+        tools=[get_corpus_tool(), get_search_tool(n_results=10)],  # local BM25 corpus, then cached web search
+        allow_delegation=False,
+        verbose=True,
+        llm=llm
+    )
+
+    # Task 1: Content Gathering
+    return Task(
+        description=(
+            f"""
+            Gather high-quality structured and unstructured content on the topic: "{topic}".
+            Start with the Internal Corpus Search tool and use what our internal notes already cover,
+            then use web search to fill the gaps.
+            Include content from:
+            - Blogs
+            - YouTube transcripts (if available)
+            - PDFs and academic sources
+            - Forums and documentation (like Stack Overflow, official docs)
+            Extract raw content, examples, definitions, and use cases. Include source references.
+
+            Notes from earlier runs on related topics (empty when there are none). Reuse what is
+            accurate and spend the search effort on what they do not cover:
+            {{prior_knowledge}}
+            """
+        ),
+        expected_output=(
+            "A raw content dump organized by type (blog, video, docs), with key points, examples, and source URLs."
+        ),
+        agent=content_gatherer
+    )
+
+
+def refine_stage(topic):
+    """Contextual Refiner: cleans gathered content for learners."""
+    from crewai import Agent, Task
+
+    llm = get_llm()
+    contextual_refiner = Agent(
+        role="Contextual Refiner",
+        goal="Filter, clean, and align content with internal knowledge style and structure",
+        backstory=(
+            "You're a skilled content editor with deep understanding of your organization's knowledge standards. "
+            "You filter noisy or irrelevant parts, remove redundancies, align content tone, and rewrite segments to match internal voice and clarity."
+        ),
+        allow_delegation=False,
+        verbose=True,
+        llm=llm
+    )
+
+    # Task 2: Contextual Refining
+    return Task(
+        description=(
+            """
+            Given the gathered content on the topic "{topic}", refine it by:
+            - Removing redundant or irrelevant parts
+            - Summarizing verbose text
+            - Retaining important "{topic}" examples, use cases, definitions
+            - Rewriting in a tone aligned to beginner/intermediate learners
+
+            🔒 Only use the provided content. Do NOT invent unrelated examples.
+
+            🧠 Example:
+            Original: "In this advanced SQL lecture, we'll explore nested queries and their complexities..."
+            Rewritten: "We’ll cover nested SQL queries and how to use them for real-world data filtering tasks in analytics."
+
+            Gathered content:
+            {gathered_content}
+            """ 
+        ),
+        expected_output=(
+            "Cleaned and well-aligned learning content broken into paragraphs, bullet points, and topic-related examples."
+        ),
+        agent=contextual_refiner
+    )
+
+
+def compose_stage(topic):
+    """Structured Output Composer: lays out the module sections."""
+    from crewai import Agent, Task
+
+    llm = get_llm()
+    output_composer = Agent(
+        role="Structured Output Composer",
+        goal="Convert refined content into a structured format with well-defined topics and subtopics",
+        backstory=(
+            "You're a content architect specializing in transforming raw insights into a structured format "
+            "used by data science learners. You categorize information into topics, subtopics, examples, key takeaways, "
+            "and organize them according to a pre-approved Excel or web-based outline."
+        ),
+        allow_delegation=False,
+        verbose=True,
+        llm=llm
+    )
+
+    # Task 3: Structuring Output
+    return Task(
+        description=(
+            """
+            Using the refined content and the topic "{topic}", structure a learning module with the following format:
+            - Overview
+            - Topics & Subtopics
+            - Key Concepts
+            - Practical Examples (using "{topic}")
+            - Summary Notes
+            - Source Links
+
+            Make sure the content is only about "{topic}" in Data Science. Avoid introducing unrelated topics like  generic learning advice.
+            """
+        ),
+        expected_output=(
+            "Markdown-structured or JSON output organized with section headers matching internal learning module format."
+        ),
+        agent=output_composer
+    )
+
+
+def validate_stage(topic):
+    """Content Quality Validator: fixes what the local checks flagged."""
+    from crewai import Agent, Task
+
+    llm = get_llm()
+    quality_validator = Agent(
+        role="Content Quality Validator",
+        goal="Ensure content is clean, coherent, non-redundant, and high quality",
+        backstory=(
+            "You're a seasoned content auditor responsible for final-stage quality checks. "
+            "You review clarity, tone consistency, factual accuracy, continuity, and remove any duplication. "
+            "You ensure the output is aligned with pedagogical standards and ready for deployment."
+        ),
+        allow_delegation=False,
+        verbose=True,
+        llm=llm
+    )
+
+    # Task 4: Final Validation
+    return Task(
+        description=(
+            """
+            Review the final content for the topic "{topic}". Your task is to:
+            - Ensure tone, formatting, and structure match internal learning material
+            - Check factual accuracy and "{topic}" terminology
+            - Remove any hallucinated, irrelevant, or unrelated parts
+            - Avoid generic or copy-pasted placeholder content
+            - Fix the problems found by the automated checks: {validation_issues}
+
+            Do not introduce anything beyond the given topic scope. Return the complete corrected module.
+
+            Content to review:
+            {composed_content}
+            """
+        ),
+        expected_output=(
+            "Polished, error-free learning module content focused only on the assigned topic, ready to publish."
+        ),
+        agent=quality_validator
+    )
+
+
+def evaluation_stage(topic):
+    """Content Evaluator: scores the final module."""
+    from crewai import Agent, Task
+
+    llm = get_llm()
+    evaluation_agent = Agent(
+        role="Content Evaluator",
+        goal="Evaluate the final output quality based on content standards and a predefined rubric",
+        backstory=(
+            "You're a meticulous evaluation specialist responsible for ensuring learning modules meet high educational standards. "
+            "You assess relevance, completeness, tone, and factual alignment with the topic. You provide a score and brief reasoning."
+        ),
+        allow_delegation=False,
+        verbose=True,
+        llm=llm
+    )
+
+    return Task(
+        description=(
+            f"""
+            Evaluate the final module output for the topic "{topic}" based on the following:
+            - Relevance to topic
+            - Completeness of explanation
+            - Clarity and beginner-friendliness
+            - Correct use of terminology
+            - Structural organization (headings, subpoints, examples)
+
+            Provide a final rating out of 10 and a short paragraph justifying the rating.
+            """
+        ),
+        expected_output="Score out of 10 with a paragraph explaining strengths and weaknesses of the content.",
+        agent=evaluation_agent
+    )
+
+
+STAGES = (gather_stage, refine_stage, compose_stage, validate_stage, evaluation_stage)
+
+
+def build_tasks(topic, lazy=True):
+    """Build fresh agents and the five pipeline tasks for one topic.
+
+    Returns (gather_task, refine_task, compose_task, validate_task, evaluation_task), in the
+    order ModuleOrchestrator expects. Call it once per topic; CrewAI mutates Task objects on kickoff.
+    With lazy=True each entry is a factory.LazyTask, so a stage's agent and task (and CrewAI
+    itself) are only built when the orchestrator reaches that stage.
+    """
+    if not lazy:
+        return tuple(stage(topic) for stage in STAGES)
+    return tuple(LazyTask(functools.partial(stage, topic)) for stage in STAGES)
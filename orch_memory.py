@@ -1,122 +1,75 @@
 # orchestrator.py
 
-import time
-import traceback
-from crewai import Crew
-from memory_layer import MemoryLayer  # 👈 Add memory layer import
-
-class ModuleOrchestrator:
-    def __init__(self, gather_task, refine_task, compose_task, validate_task, evaluation_task, topic):
+from search_cache import search_cache
+from stage_helpers import StageHelpers
+from prevalidator import PreValidator
+from memory_layer import MemoryLayer, MemoryPolicy, summarize  # 👈 Add memory layer import
+
+class ModuleOrchestrator(StageHelpers):
+    def __init__(self, gather_task, refine_task, compose_task, validate_task, evaluation_task, topic,
+                 cache=None, force_regenerate=False, log_sink=None, cassette=None, retry_policy=None, run_id=None, checkpoints=None, prevalidator=None, memory_policy=None, memory=None,
+                 refine_chunk_tokens=None, refine_workers=4, gatherer=None):
         self.gather_task = gather_task
         self.refine_task = refine_task
         self.compose_task = compose_task
         self.validate_task = validate_task
         self.evaluation_task = evaluation_task
-        self.topic = topic
-        self.logs = []
-        self.memory = MemoryLayer()  # 👈 Initialize memory layer
-
-    def log(self, step, status, detail=""):
-        timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
-        log_entry = {
-            "timestamp": timestamp,
-            "step": step,
-            "status": status,
-            "detail": detail
-        }
-        self.logs.append(log_entry)
-        print(f"[{timestamp}] [{step}] [{status}] {detail}")
-
-    def execute_task(self, task, input_data, retries=2):
-        for attempt in range(retries):
-            try:
-                self.log(task.agent.role, f"Attempt {attempt + 1}", "Running task...")
-
-                # Inject topic to input_data
-                input_data["topic"] = self.topic
-
-                # Inject memory into input
-                input_data = self.memory.inject_memory(input_data)
-
-                self.log(task.agent.role, "Input", str(input_data))
-                start_time = time.time()
-
-                mini_crew = Crew(
-                    agents=[task.agent],
-                    tasks=[task],
-                    verbose=False
-                )
-                result = mini_crew.kickoff(inputs=input_data)
-
-                duration = time.time() - start_time
-                self.log(task.agent.role, "Timing", f"⏱️ Took {duration:.2f} seconds")
-
-                # Normalize the result
-                if hasattr(result, "output"):
-                    result_output = result.output
-                elif isinstance(result, dict) and "output" in result:
-                    result_output = result["output"]
-                else:
-                    result_output = str(result)  # Force stringify fallback
-
-                self.log(task.agent.role, "Output", str(result_output))
-
-                # Log if topic doesn't appear (only for strings)
-                if isinstance(result_output, str) and self.topic.lower() not in result_output.lower():
-                    self.log(task.agent.role, "Warning", "⚠️ Output may be unrelated to the topic.")
-
-                # Check for output sufficiency
-                if isinstance(result_output, str) and len(result_output.strip()) > 50:
-                    self.log(task.agent.role, "Success")
-                    self.memory.remember(task.agent.role, result_output)  # 👈 Store in memory
-                    return result_output
-                else:
-                    self.log(task.agent.role, "Warning", f"Received output type: {type(result_output)}")
-                    raise ValueError("Empty or insufficient output.")
-
-            except Exception as e:
-                self.log(task.agent.role, "Error", str(e))
-                self.log(task.agent.role, "Traceback", traceback.format_exc())
-                time.sleep(1)
-
-        self.log(task.agent.role, "Failed", "Max retries reached.")
-        return None
-
-    def run_pipeline(self):
+        self._init_runtime(topic, cache, force_regenerate, log_sink, cassette, retry_policy, gatherer)
+        self._init_checkpoints(run_id, checkpoints)
+        # Local structure/duplication/link/relevance checks; the LLM validator only runs when they fail
+        self.prevalidator = prevalidator or PreValidator(min_relevance=self.RELEVANCE_THRESHOLD)
+        # 👈 Initialize memory layer; by default a stage sees the last two outputs within ~2000 tokens
+        self.memory = memory if memory is not None else MemoryLayer()
+        if memory_policy is not None or self.memory.default_policy is None:
+            self.memory.default_policy = memory_policy or MemoryPolicy(last_k=2, token_budget=2000)
+        self.refine_chunk_tokens = refine_chunk_tokens
+        self.refine_workers = refine_workers
+
+    def _run_stages(self):
         self.log("Orchestrator", "Starting", f"Generating content for topic: {self.topic}")
 
-        # Step 1: Gather Content
-        raw_content = self.execute_task(self.gather_task, {"topic": self.topic})
+        # Step 1: Gather Content, seeded with related outputs from earlier runs when memory is persistent.
+        # The gather prompt has a {prior_knowledge} placeholder, so the key is always present.
+        gather_input = {"topic": self.topic, "prior_knowledge": ""}
+        if hasattr(self.memory, "recall") and "gather" not in self.completed_stages:
+            related = self.memory.recall(self.topic, limit=3, steps=[self.refine_task.agent.role, self.compose_task.agent.role])
+            if related:
+                self.log("Orchestrator", "Recall", f"🧠 {len(related)} related entries from earlier runs")
+                gather_input["prior_knowledge"] = "\n\n".join(
+                    f"### {item['topic']} ({item['step']})\n{summarize(item['content'], 600)}" for item in related
+                )
+        raw_content = self.run_stage("gather", lambda: self.gather_content(gather_input))
         if not raw_content:
             return "❌ Pipeline failed at Content Gathering."
 
+        # Drop near-duplicate sources so the refiner sees each one once
+        raw_content = self.dedupe_sources(raw_content)
+
         # Step 2: Refine Content
-        refined = self.execute_task(self.refine_task, {"gathered_content": raw_content, "topic": self.topic})
+        refined = self.run_stage("refine", lambda: self.refine_content(raw_content))
         if not refined:
             return "❌ Pipeline failed at Contextual Refining."
 
         # Step 3: Compose Output
-        structured = self.execute_task(self.compose_task, {"refined_content": refined, "topic": self.topic})
+        structured = self.run_stage("compose", lambda: self.execute_task(self.compose_task, {"refined_content": refined, "topic": self.topic}))
         if not structured:
             return "❌ Pipeline failed at Structuring Output."
 
-        # Step 4: Validate Final Output
-        final_output = self.execute_task(self.validate_task, {"composed_content": structured})
+        # Step 4: Validate Final Output (LLM validation only when the local checks fail)
+        final_output = self.run_stage("validate", lambda: self.validate_content(structured))
         if not final_output:
             self.log("Content Quality Validator", "Fallback", "🛠️ Using previous structured output without validation.")
             final_output = structured
 
         # Step 5: Evaluate Final Output
-        evaluation = self.execute_task(self.evaluation_task, {"final_output": final_output})
+        evaluation = self.run_stage("evaluate", lambda: self.execute_task(self.evaluation_task, {"final_output": final_output}), final=True)
         if evaluation:
             self.log("Evaluation Agent", "Completed", f"🧪 Score: {evaluation}")
             self.memory.remember("Evaluation Score", evaluation) 
         else:
             self.log("Evaluation Agent", "Skipped", "No evaluation provided.")
 
+        self.log("Orchestrator", "Cache", f"📦 LLM result cache {self.cache_stats()}")
+        self.log("Orchestrator", "Cache", f"🔎 Search cache {search_cache.stats()}")
         self.log("Orchestrator", "Completed", "Module content created successfully.")
         return final_output
-
-
-    def get_logs(self):
-        return self.logs
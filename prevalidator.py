@@ -0,0 +1,127 @@
+# prevalidator.py
+
+import re
+from similarity import topic_relevance
+
+# Section headings the compose task asks for, in order
+REQUIRED_SECTIONS = (
+    "Overview",
+    "Topics & Subtopics",
+    "Key Concepts",
+    "Practical Examples",
+    "Summary Notes",
+    "Source Links",
+)
+
+URL = re.compile(r"https?://[^\s)\]>\"']+")
+# Markdown heading, bold line, numbered or "Heading:" line; group 1 is the heading text
+HEADING_LINE = re.compile(r"^\s*(?:#{1,6}\s*|\d+[.)]\s*|[-*]\s+)?(?:\*\*|__)?\s*([^*_\n]{2,80}?)\s*(?:\*\*|__)?\s*:?\s*$")
+# Lines that are unmistakably headings, stripped before comparing paragraphs
+MARKED_HEADING = re.compile(r"^\s*(?:#{1,6}\s.*|\*\*[^*\n]+\*\*:?|__[^_\n]+__:?|[A-Z][^.:\n]{1,60}:)\s*$")
+
+
+def _normalize_heading(text):
+    text = text.lower().replace("&", " and ")
+    return " ".join(re.findall(r"[a-z0-9]+", text))
+
+
+def _paragraphs(text):
+    paragraphs = []
+    for block in re.split(r"\n\s*\n", text):
+        lines = block.strip().splitlines()
+        while lines and MARKED_HEADING.match(lines[0]):
+            lines = lines[1:]
+        if lines:
+            paragraphs.append("\n".join(lines))
+    return paragraphs
+
+
+class PreValidator:
+    """Deterministic checks on a composed module, run before (and usually instead of) the LLM validator.
+
+    Every failed check lowers the score by its penalty; the module passes when the score stays at or
+    above min_score and topic relevance reaches min_relevance.
+    """
+
+    PENALTIES = {"missing_section": 0.15, "duplicate_paragraph": 0.05, "missing_links": 0.2}
+
+    def __init__(self, required_sections=REQUIRED_SECTIONS, min_score=0.9, min_relevance=0.05, min_paragraph_chars=40):
+        self.required_sections = list(required_sections)
+        self.min_score = min_score
+        self.min_relevance = min_relevance
+        self.min_paragraph_chars = min_paragraph_chars
+
+    def find_sections(self, text):
+        # Required section -> (line index) of its heading, for the headings present
+        wanted = {_normalize_heading(name): name for name in self.required_sections}
+        found = {}
+        for index, line in enumerate(text.splitlines()):
+            match = HEADING_LINE.match(line)
+            if not match:
+                continue
+            heading = _normalize_heading(match.group(1))
+            for key, name in wanted.items():
+                # "Practical Examples (using Statistics)" still counts as "Practical Examples"
+                if name not in found and (heading == key or heading.startswith(key + " ")):
+                    found[name] = index
+        return found
+
+    def duplicate_paragraphs(self, text):
+        seen = set()
+        duplicates = []
+        for paragraph in _paragraphs(text):
+            fingerprint = " ".join(paragraph.lower().split())
+            if len(fingerprint) < self.min_paragraph_chars:
+                continue  # headings and short bullets repeat legitimately
+            if fingerprint in seen:
+                duplicates.append(paragraph)
+            seen.add(fingerprint)
+        return duplicates
+
+    def source_links(self, text, sections):
+        # URLs under the Source Links heading, falling back to any URL in the module
+        lines = text.splitlines()
+        start = sections.get("Source Links")
+        if start is not None:
+            following = [i for i in sections.values() if i > start]
+            end = min(following) if following else len(lines)
+            links = URL.findall("\n".join(lines[start:end]))
+            if links:
+                return links
+        return URL.findall(text)
+
+    def check(self, text, topic):
+        text = text if isinstance(text, str) else str(text)
+        issues = []
+        penalty = 0.0
+
+        sections = self.find_sections(text)
+        missing = [name for name in self.required_sections if name not in sections]
+        for name in missing:
+            issues.append(f"missing section: {name}")
+            penalty += self.PENALTIES["missing_section"]
+
+        duplicates = self.duplicate_paragraphs(text)
+        if duplicates:
+            issues.append(f"{len(duplicates)} duplicated paragraph(s)")
+            penalty += self.PENALTIES["duplicate_paragraph"] * len(duplicates)
+
+        links = self.source_links(text, sections)
+        if not links:
+            issues.append("no source links")
+            penalty += self.PENALTIES["missing_links"]
+
+        relevance = topic_relevance(topic, text)
+        if relevance < self.min_relevance:
+            issues.append(f"low topic relevance ({relevance:.3f})")
+
+        score = round(max(0.0, 1.0 - penalty), 3)
+        return {
+            "passed": score >= self.min_score and relevance >= self.min_relevance,
+            "score": score,
+            "relevance": round(relevance, 3),
+            "missing_sections": missing,
+            "duplicate_paragraphs": len(duplicates),
+            "links": len(links),
+            "issues": issues,
+        }
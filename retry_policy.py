@@ -0,0 +1,209 @@
+# retry_policy.py
+
+import random
+import re
+import threading
+import time
+
+RATE_LIMIT = "rate_limit"
+TIMEOUT = "timeout"
+VALIDATION = "validation"
+FATAL = "fatal"
+TRANSIENT = "transient"
+
+# Exception class names raised by LiteLLM/OpenAI/httpx (matched anywhere in the MRO)
+_RATE_LIMIT_NAMES = {"RateLimitError"}
+_TIMEOUT_NAMES = {"Timeout", "TimeoutError", "APITimeoutError", "ReadTimeout", "ConnectTimeout"}
+_FATAL_NAMES = {
+    "AuthenticationError", "PermissionDeniedError", "NotFoundError", "BadRequestError",
+    "ContextWindowExceededError", "ContentPolicyViolationError", "UnsupportedParamsError", "CassetteMiss",
+}
+# Bugs in our own code (a bad key, a wrong argument): retrying cannot fix them. Raised from inside
+# Crew.kickoff they are usually CrewAI reporting a bad model reply (ValueError("Invalid response from
+# LLM call - None or empty.")), which a retry can fix; a missing template variable is the exception.
+_LOCAL_ERRORS = (LookupError, TypeError, AttributeError, NameError, ValueError, AssertionError, ImportError, NotImplementedError)
+_TEMPLATE_ERROR = re.compile(r"template variable", re.IGNORECASE)
+
+
+class InsufficientOutput(ValueError):
+    """The model answered, but the output is empty or too short to use."""
+
+
+class CircuitOpenError(RuntimeError):
+    def __init__(self, provider, retry_in):
+        super().__init__(f"Circuit open for {provider}; retry in {retry_in:.1f}s")
+        self.provider = provider
+        self.retry_in = retry_in
+
+
+def _status_code(exc):
+    status = getattr(exc, "status_code", None) or getattr(getattr(exc, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def classify_error(exc, in_provider_call=False):
+    # in_provider_call: exc came out of Crew.kickoff rather than our own code around it
+    if isinstance(exc, InsufficientOutput):
+        return VALIDATION
+    if isinstance(exc, CircuitOpenError):
+        return RATE_LIMIT
+    names = {cls.__name__ for cls in type(exc).__mro__}
+    if names & _RATE_LIMIT_NAMES:
+        return RATE_LIMIT
+    if names & _TIMEOUT_NAMES:
+        return TIMEOUT
+    if names & _FATAL_NAMES:
+        return FATAL
+    if isinstance(exc, _LOCAL_ERRORS) and (not in_provider_call or _TEMPLATE_ERROR.search(str(exc))):
+        return FATAL
+
+    status = _status_code(exc)
+    if status == 429:
+        return RATE_LIMIT
+    if status in (408, 504):
+        return TIMEOUT
+    if status in (400, 401, 403, 404, 422):
+        return FATAL
+
+    # CrewAI sometimes re-raises provider errors as plain exceptions; fall back to the message
+    message = re.sub(r"[^a-z0-9]", "", str(exc).lower())
+    if "ratelimit" in message or "toomanyrequests" in message:
+        return RATE_LIMIT
+    if "timedout" in message or "timeout" in message:
+        return TIMEOUT
+    return TRANSIENT
+
+
+def retry_after(exc):
+    # Server hint in seconds: Retry-After header, or "try again in 1.5s / 200ms" in the message
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if headers is not None:
+        try:
+            value = headers.get("retry-after")
+            if value is not None:
+                return float(value)
+        except (TypeError, ValueError, AttributeError):
+            pass
+    match = re.search(r"try again in (\d+(?:\.\d+)?)\s*(ms|s)\b", str(exc), re.IGNORECASE)
+    if match:
+        return float(match.group(1)) / (1000 if match.group(2).lower() == "ms" else 1)
+    return None
+
+
+class RetryPolicy:
+    """Attempt budget per error kind and exponential backoff with jitter between attempts.
+
+    Validation failures (short output) retry immediately, fatal errors never retry, and throttling
+    honours the provider's retry-after hint when it is longer than the computed backoff. Each kind's
+    budget decides on its own; validation keeps the orchestrators' original two attempts.
+    max_attempts only bounds a task that fails with a mix of kinds, and defaults to the largest budget.
+    """
+
+    DEFAULT_ATTEMPTS = {RATE_LIMIT: 6, TIMEOUT: 3, TRANSIENT: 3, VALIDATION: 2, FATAL: 1}
+
+    def __init__(self, attempts=None, max_attempts=None, base_delay=1.0, multiplier=2.0, max_delay=60.0, jitter=True):
+        self.attempts = dict(self.DEFAULT_ATTEMPTS, **(attempts or {}))
+        self.max_attempts = max_attempts or max(self.attempts.values())
+        self.base_delay = base_delay
+        self.multiplier = multiplier
+        self.max_delay = max_delay
+        self.jitter = jitter
+
+    def allows(self, kind, failures):
+        # failures: how many attempts have already failed with this kind
+        return failures < self.attempts.get(kind, 1)
+
+    def delay(self, kind, failures, exc=None):
+        if kind == VALIDATION:
+            return 0.0
+        ceiling = min(self.max_delay, self.base_delay * self.multiplier ** max(failures - 1, 0))
+        # Equal jitter: at least half the backoff, so throttled pipelines do not retry in lockstep
+        delay = ceiling / 2 + random.uniform(0, ceiling / 2) if self.jitter else ceiling
+        hint = exc.retry_in if isinstance(exc, CircuitOpenError) else retry_after(exc)
+        if hint:
+            delay = max(delay, min(hint, self.max_delay))
+        return delay
+
+
+default_policy = RetryPolicy()
+
+
+class CircuitBreaker:
+    """Opens after consecutive provider failures; while open, calls fail fast until a cooldown passes.
+
+    After the cooldown one probe call is let through (half-open): success closes the circuit,
+    another provider failure opens it again.
+    """
+
+    def __init__(self, provider, failure_threshold=5, cooldown=30.0):
+        self.provider = provider
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        with self._lock:
+            if self.state == "open":
+                remaining = self.opened_at + self.cooldown - time.monotonic()
+                if remaining > 0:
+                    raise CircuitOpenError(self.provider, remaining)
+                self.state = "half_open"
+            if self.state == "half_open":
+                if self._probing:
+                    raise CircuitOpenError(self.provider, min(self.cooldown, 5.0))
+                self._probing = True
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self, kind):
+        with self._lock:
+            self._probing = False
+            if kind not in (RATE_LIMIT, TIMEOUT, TRANSIENT):
+                return  # fatal errors are about the request, not provider health; the next call probes
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def snapshot(self):
+        with self._lock:
+            return {"provider": self.provider, "state": self.state, "failures": self.failures}
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def provider_name(model):
+    # "openai/gpt-4o" -> "openai"; bare model names are mapped by family
+    name = str(model or "unknown").lower()
+    if "/" in name:
+        return name.split("/", 1)[0]
+    if name.startswith(("gpt-", "o1", "o3", "text-")):
+        return "openai"
+    if name.startswith("claude"):
+        return "anthropic"
+    if name.startswith("gemini"):
+        return "gemini"
+    return name
+
+
+def get_breaker(provider):
+    # One breaker per provider, shared by every pipeline in the process
+    with _breakers_lock:
+        if provider not in _breakers:
+            _breakers[provider] = CircuitBreaker(provider)
+        return _breakers[provider]
+
+
+def retry_summary(attempts, failures, backoff_seconds):
+    kinds = " ".join(f"{kind}={count}" for kind, count in sorted(failures.items()))
+    return f"🔁 attempts={attempts} {kinds} backoff={backoff_seconds:.1f}s".replace("  ", " ")
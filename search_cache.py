@@ -0,0 +1,150 @@
+# search_cache.py
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+
+class _Flight:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def normalize_query(query):
+    # Case, whitespace and surrounding punctuation do not change what the search engine returns
+    text = " ".join(str(query or "").lower().split())
+    return re.sub(r"^[\s\"'`.,;:!?]+|[\s\"'`.,;:!?]+$", "", text)
+
+
+class SearchCache:
+    """Disk cache of web search results keyed on (normalized query, result count), with TTL eviction.
+
+    Concurrent lookups of the same key from any pipeline in the process share one request.
+    """
+
+    def __init__(self, cache_dir=".cache/search", ttl_seconds=24 * 3600, max_entries=5000):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._lock = threading.Lock()
+        self._inflight = {}
+
+    def make_key(self, query, n_results, **params):
+        payload = {"query": normalize_query(query), "n": n_results, **{k: v for k, v in params.items() if v is not None}}
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry.get("created", 0) > self.ttl_seconds:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return entry
+
+    def set(self, key, query, result):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"query": query, "created": time.time(), "result": result}, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, path)
+        self._evict()
+
+    def _evict(self):
+        # Expired entries first, then the oldest until max_entries remain
+        try:
+            names = [n for n in os.listdir(self.cache_dir) if n.endswith(".json")]
+        except OSError:
+            return
+        if len(names) <= self.max_entries:
+            return
+        now = time.time()
+        entries = []
+        for name in names:
+            path = os.path.join(self.cache_dir, name)
+            try:
+                entries.append((os.path.getmtime(path), path))
+            except OSError:
+                continue
+        entries.sort()
+        excess = len(entries) - self.max_entries
+        for mtime, path in entries:
+            if excess <= 0 and now - mtime <= self.ttl_seconds:
+                break
+            try:
+                os.remove(path)
+                excess -= 1
+            except OSError:
+                pass
+
+    def get_or_fetch(self, query, n_results, fetch, **params):
+        key = self.make_key(query, n_results, **params)
+        entry = self.get(key)
+        if entry is not None:
+            with self._lock:
+                self.hits += 1
+            return entry["result"]
+
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._inflight[key] = flight
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            result = fetch()
+            try:
+                self.set(key, query, result)
+            except OSError:
+                pass  # a read-only or full disk only costs us the cache
+            flight.result = result
+            return result
+        except Exception as e:
+            flight.error = e  # errors are shared with waiters but never cached
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+
+    def stats(self):
+        total = self.hits + self.misses + self.coalesced
+        saved = self.hits + self.coalesced
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": round(saved / total, 3) if total else 0.0,
+        }
+
+
+# Shared by every search tool in the process so concurrent pipelines coalesce
+search_cache = SearchCache()
@@ -0,0 +1,184 @@
+# similarity.py
+
+import functools
+import re
+import threading
+import numpy as np
+from scipy import sparse
+from corpus_index import tokenize
+
+
+class TfidfIndex:
+    """Sparse TF-IDF matrix with incremental adds and batched top-k cosine queries.
+
+    Raw term counts are kept as a CSR matrix; adding documents appends rows (and columns for new
+    terms), and the weighted, L2-normalized matrix is rebuilt lazily on the next query.
+    """
+
+    def __init__(self, sublinear_tf=True):
+        self.sublinear_tf = sublinear_tf
+        self.vocabulary = {}
+        self.keys = []
+        self._counts = sparse.csr_matrix((0, 0), dtype=np.float32)
+        self._df = np.zeros(0, dtype=np.int64)
+        self._weighted = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _count_rows(self, texts, vocabulary, grow):
+        indptr = [0]
+        indices = []
+        data = []
+        for text in texts:
+            counts = {}
+            for token in tokenize(text):
+                column = vocabulary.get(token)
+                if column is None:
+                    if not grow:
+                        continue
+                    column = vocabulary[token] = len(vocabulary)
+                counts[column] = counts.get(column, 0) + 1
+            indices.extend(counts.keys())
+            data.extend(counts.values())
+            indptr.append(len(indices))
+        return sparse.csr_matrix(
+            (np.asarray(data, dtype=np.float32), np.asarray(indices, dtype=np.int64), np.asarray(indptr, dtype=np.int64)),
+            shape=(len(texts), len(vocabulary)),
+        )
+
+    def add(self, texts, keys=None):
+        texts = list(texts)
+        keys = list(keys) if keys is not None else list(range(len(self.keys), len(self.keys) + len(texts)))
+        with self._lock:
+            block = self._count_rows(texts, self.vocabulary, grow=True)
+            width = len(self.vocabulary)
+            counts = self._counts.copy()
+            counts.resize((counts.shape[0], width))
+            self._counts = sparse.vstack([counts, block], format="csr")
+            self._df = np.concatenate([self._df, np.zeros(width - self._df.shape[0], dtype=np.int64)])
+            self._df += np.bincount(block.indices, minlength=width)
+            self.keys.extend(keys)
+            self._weighted = None
+
+    def _idf(self, extra_columns=0):
+        # Smooth idf; columns for terms the index has never seen behave as df = 0
+        n = len(self.keys)
+        df = np.concatenate([self._df, np.zeros(extra_columns, dtype=np.int64)])
+        return np.log((1.0 + n) / (1.0 + df)) + 1.0
+
+    def _weigh(self, counts, idf):
+        weighted = counts.astype(np.float32, copy=True)
+        if self.sublinear_tf:
+            weighted.data = 1.0 + np.log(weighted.data)
+        weighted = weighted.multiply(idf.astype(np.float32)).tocsr()
+        norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        return sparse.diags(1.0 / norms).dot(weighted).tocsr()
+
+    def _matrix(self):
+        with self._lock:
+            if self._weighted is None:
+                self._weighted = self._weigh(self._counts, self._idf())
+            return self._weighted
+
+    def transform(self, texts):
+        """Weighted query vectors in the index's term space; unknown terms are ignored."""
+        return self._weigh(self._count_rows(list(texts), self.vocabulary, grow=False), self._idf())
+
+    def query(self, texts, top_k=5):
+        """For each text, the top_k (key, cosine) pairs from the index, best first."""
+        if not len(self.keys):
+            return [[] for _ in texts]
+        scores = self.transform(texts).dot(self._matrix().T).toarray()
+        k = min(top_k, scores.shape[1])
+        results = []
+        for row in scores:
+            top = np.argpartition(-row, k - 1)[:k]
+            top = top[np.argsort(-row[top])]
+            results.append([(self.keys[i], float(row[i])) for i in top if row[i] > 0])
+        return results
+
+    def expand(self, text, top_k=3, weight=0.5):
+        """Query vector for text plus weight x the centroid of its top_k nearest documents.
+
+        Pseudo-relevance feedback: a short topic picks up the vocabulary of the corpus sections
+        about it, so text that is on topic without repeating the topic's words still scores.
+        """
+        vector = self.transform([text])
+        if not len(self.keys) or not vector.nnz:
+            return vector
+        matrix = self._matrix()
+        scores = vector.dot(matrix.T).toarray()[0]
+        top = [i for i in np.argsort(-scores)[:top_k] if scores[i] > 0]
+        if top:
+            vector = sparse.csr_matrix(vector + weight * sparse.csr_matrix(matrix[top].mean(axis=0)))
+        norm = np.sqrt(vector.multiply(vector).sum())
+        return vector / norm if norm else vector
+
+    def pairwise(self, queries, documents):
+        """Cosine similarity of each query against each document, using this index for idf.
+
+        Terms missing from the index still count (as maximally rare), so two unseen texts can be compared.
+        """
+        queries = list(queries)
+        vocabulary = dict(self.vocabulary)
+        counts = self._count_rows(queries + list(documents), vocabulary, grow=True)
+        weighted = self._weigh(counts, self._idf(len(vocabulary) - len(self.vocabulary)))
+        return weighted[: len(queries)].dot(weighted[len(queries):].T).toarray()
+
+
+_background = None
+_background_lock = threading.Lock()
+
+
+def background_index():
+    """Process-wide TfidfIndex over the data/ corpus sections, used as the idf reference."""
+    global _background
+    with _background_lock:
+        if _background is None:
+            from corpus_index import CorpusIndex
+
+            corpus = CorpusIndex.open()
+            index = TfidfIndex()
+            sections = [corpus.section(i) for i in range(corpus.documents)]
+            index.add(
+                (f"{s['heading'] or ''}\n{s['text']}" for s in sections),
+                keys=[f"{s['source']}#{i}" for i, s in enumerate(sections)],
+            )
+            corpus.close()
+            _background = index
+        return _background
+
+
+CAMEL_BOUNDARY = re.compile(r"(?<=[a-z])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])")
+
+
+def split_compounds(text, vocabulary):
+    """"DataScience" -> "Data Science"; "datascience" -> "data science" when both halves are known terms."""
+    words = []
+    for word in CAMEL_BOUNDARY.sub(" ", text).split():
+        lowered = word.lower()
+        if len(lowered) >= 6 and lowered.isalpha() and lowered not in vocabulary:
+            for i in range(2, len(lowered) - 1):
+                if lowered[:i] in vocabulary and lowered[i:] in vocabulary:
+                    word = f"{lowered[:i]} {lowered[i:]}"
+                    break
+        words.append(word)
+    return " ".join(words)
+
+
+@functools.lru_cache(maxsize=256)
+def _topic_vector(topic):
+    index = background_index()
+    return index.expand(split_compounds(topic, index.vocabulary))
+
+
+def topic_relevance(topic, text):
+    """Cosine of text against the topic, the better of the literal topic and its corpus expansion."""
+    index = background_index()
+    normalized = split_compounds(topic, index.vocabulary)
+    literal = float(index.pairwise([normalized], [text])[0, 0])
+    expanded = float(_topic_vector(topic).dot(index.transform([text]).T).toarray()[0, 0])
+    return max(literal, expanded)
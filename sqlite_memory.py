@@ -0,0 +1,131 @@
+# sqlite_memory.py
+
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from memory_layer import MemoryLayer
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS memories (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    step TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS memories_run_step ON memories (run_id, step, id);
+CREATE INDEX IF NOT EXISTS memories_topic ON memories (topic, id);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS memories_fts USING fts5(
+    content, topic, step, content='memories', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS memories_ai AFTER INSERT ON memories BEGIN
+    INSERT INTO memories_fts (rowid, content, topic, step) VALUES (new.id, new.content, new.topic, new.step);
+END;
+CREATE TRIGGER IF NOT EXISTS memories_ad AFTER DELETE ON memories BEGIN
+    INSERT INTO memories_fts (memories_fts, rowid, content, topic, step)
+    VALUES ('delete', old.id, old.content, old.topic, old.step);
+END;
+"""
+
+
+class SQLiteMemoryLayer(MemoryLayer):
+    """MemoryLayer that also persists every entry to SQLite for recall in later runs.
+
+    The current run's entries stay in memory, so remember/get_last/get_history/inject_memory
+    behave exactly like MemoryLayer. recall() searches earlier runs through an FTS5 index
+    without loading them.
+    """
+
+    def __init__(self, topic, db_path=".cache/memory.sqlite3", run_id=None, default_policy=None):
+        super().__init__(default_policy=default_policy)
+        self.topic = topic
+        self.run_id = run_id or uuid.uuid4().hex
+        self.db_path = db_path
+        self._lock = threading.Lock()
+
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        try:
+            self._conn.executescript(FTS_SCHEMA)
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5; recall falls back to LIKE matching
+            self.has_fts = False
+        self._conn.commit()
+
+    def remember(self, step_name, content):
+        super().remember(step_name, content)
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO memories (run_id, topic, step, content, created) VALUES (?, ?, ?, ?, ?)",
+                (self.run_id, self.topic, step_name, str(content), time.time()),
+            )
+            self._conn.commit()
+
+    def load_run(self, run_id):
+        # Replace the in-memory history with the entries of an earlier run
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT step, content FROM memories WHERE run_id = ? ORDER BY id", (run_id,)
+            ).fetchall()
+        self.run_id = run_id
+        self.history = []
+        self._by_step = {}
+        for step, content in rows:
+            MemoryLayer.remember(self, step, content)
+        return self.history
+
+    @staticmethod
+    def _match_query(text):
+        terms = list(dict.fromkeys(t.lower() for t in re.findall(r"\w{3,}", text)))
+        return " OR ".join(f'"{t}"' for t in terms[:32])
+
+    def recall(self, query=None, limit=5, steps=None, include_current_run=False):
+        """Return the prior entries most relevant to query (default: this layer's topic), best first."""
+        query = query or self.topic
+        filters = []
+        params = []
+        if not include_current_run:
+            filters.append("m.run_id != ?")
+            params.append(self.run_id)
+        if steps:
+            filters.append(f"m.step IN ({', '.join('?' for _ in steps)})")
+            params.extend(steps)
+        where = "".join(f" AND {f}" for f in filters)
+
+        with self._lock:
+            if self.has_fts:
+                match = self._match_query(query)
+                if not match:
+                    return []
+                rows = self._conn.execute(
+                    "SELECT m.run_id, m.topic, m.step, m.content, m.created FROM memories_fts f "
+                    "JOIN memories m ON m.id = f.rowid "
+                    f"WHERE memories_fts MATCH ?{where} ORDER BY bm25(memories_fts) LIMIT ?",
+                    [match, *params, limit],
+                ).fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT m.run_id, m.topic, m.step, m.content, m.created FROM memories m "
+                    f"WHERE (m.topic LIKE ? OR m.content LIKE ?){where} ORDER BY m.id DESC LIMIT ?",
+                    [f"%{query}%", f"%{query}%", *params, limit],
+                ).fetchall()
+
+        return [
+            {"run_id": run_id, "topic": topic, "step": step, "content": content, "created": created}
+            for run_id, topic, step, content, created in rows
+        ]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
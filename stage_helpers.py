@@ -0,0 +1,346 @@
+# stage_helpers.py
+
+import copy
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from crewai import Crew
+from checkpoint import CheckpointStore
+from content_chunker import chunk_content, estimate_tokens, merge_refined
+from dedup import dedupe_content
+from factory import materialize
+from llm_cache import LLMResultCache
+from log_sink import LogSink
+from metrics import RunMetrics
+from retry_policy import (
+    CircuitOpenError, InsufficientOutput, classify_error, default_policy, get_breaker, provider_name, retry_summary,
+)
+from similarity import topic_relevance
+
+
+def clone_task(task):
+    # Tasks and agents are mutated on kickoff, so concurrent runs of one task need their own copies
+    task = materialize(task)
+    agent = task.agent.copy() if hasattr(task.agent, "copy") else task.agent
+    if hasattr(task, "model_copy"):
+        return task.model_copy(update={"agent": agent})
+    clone = copy.copy(task)
+    clone.agent = agent
+    return clone
+
+
+class StageHelpers:
+    """Task execution and the gather, refine, dedup and validate steps shared by the orchestrators.
+
+    Hosts call _init_runtime() (and _init_checkpoints() to support resume) from __init__, set their
+    own tasks (gather_task, ... as they use them) plus prevalidator for validate_content, and
+    implement _run_stages(). memory is optional: when set, stages read it through _inject_memory,
+    write it through _remember, and checkpoints carry it via _checkpoint_memory.
+    """
+
+    RELEVANCE_THRESHOLD = 0.05  # TF-IDF cosine between topic and output below which we warn
+    DEDUPE_THRESHOLD = 0.8  # estimated Jaccard similarity at which gathered sources count as duplicates
+    memory = None
+    refine_chunk_tokens = None  # token budget per refine chunk; None refines in one call
+    refine_workers = 4
+
+    def _init_runtime(self, topic, cache=None, force_regenerate=False, log_sink=None, cassette=None, retry_policy=None, gatherer=None):
+        self.topic = topic
+        # Leveled, truncating sink: bounded in-memory buffer plus a JSONL file written in the background
+        self.sink = log_sink or LogSink(name=topic)
+        self.logs = self.sink.buffer
+        self.metrics = RunMetrics(topic)
+        self.cache = cache if cache is not None else LLMResultCache()
+        self.force_regenerate = force_regenerate  # skip cache reads but still refresh entries
+        # Record/replay LLM and tool traffic; cache reads are skipped so every call reaches the cassette
+        self.cassette = cassette
+        if cassette is not None:
+            self.force_regenerate = True
+        # Optional gather_fanout.FanOutGatherer that replaces the gather agent with parallel sources
+        self.gatherer = gatherer
+        self.retry_policy = retry_policy or default_policy  # backoff, per-kind budgets; breakers are per provider
+
+    def _init_checkpoints(self, run_id=None, checkpoints=None):
+        # Stage outputs are checkpointed per (run id, topic) so run_pipeline(resume=True) can pick up a failed run
+        self.run_id = run_id or uuid.uuid4().hex
+        self._resume_latest = run_id is None  # no explicit run id: resume the topic's most recent run
+        self.checkpoints = checkpoints if checkpoints is not None else CheckpointStore()
+        self.completed_stages = {}
+
+    def log(self, step, status, detail="", level=None):
+        return self.sink.log(step, status, detail, level)
+
+    def get_logs(self):
+        return self.sink.get_logs()
+
+    def close(self):
+        self.sink.close()
+
+    def cache_stats(self):
+        stats = self.cache.stats()
+        return f"hits={stats['hits']} misses={stats['misses']}"
+
+    def _inject_memory(self, role, input_data):
+        if self.memory is None:
+            return input_data
+        return self.memory.inject_memory(input_data, step_name=role)
+
+    def _remember(self, role, output):
+        if self.memory is not None:
+            self.memory.remember(role, output)
+
+    def execute_task(self, task, input_data, retries=None, remember=True):
+        task = materialize(task)  # lazy tasks from module_tasks are built on first use
+        role = task.agent.role
+
+        # Inject topic and memory into input_data
+        input_data["topic"] = self.topic
+        input_data = self._inject_memory(role, input_data)
+
+        # Serve identical (role, task, model, inputs) requests from the result cache
+        cache_key = self.cache.make_key(task, input_data)
+        if not self.force_regenerate:
+            cached_output = self.cache.get(cache_key)
+            if cached_output is not None:
+                self.log(role, "Cache", f"♻️ Hit ({self.cache_stats()})")
+                self.metrics.cache_hit(role)
+                self.log(role, "Success")
+                if remember:
+                    self._remember(role, cached_output)
+                return cached_output
+            self.log(role, "Cache", f"Miss ({self.cache_stats()})")
+        else:
+            self.log(role, "Cache", "Bypassed (force_regenerate)")
+
+        breaker = get_breaker(provider_name(LLMResultCache.model_name(task)))
+        max_attempts = retries or self.retry_policy.max_attempts
+        failures = {}  # error kind -> failed attempts
+        backoff_seconds = 0.0
+        mini_crew = None  # built once; retries reuse it
+        calling_provider = False  # only errors raised by kickoff itself count against the breaker
+
+        for attempt in range(max_attempts):
+            try:
+                self.log(role, f"Attempt {attempt + 1}", "Running task...")
+                self.metrics.attempt(role, attempt)
+
+                self.log(role, "Input", input_data)  # truncated per field by the sink
+                start_time = time.time()
+
+                if mini_crew is None:
+                    mini_crew = Crew(
+                        agents=[task.agent],
+                        tasks=[task],
+                        verbose=False
+                    )
+                breaker.before_call()
+                calling_provider = True
+                result = mini_crew.kickoff(inputs=input_data)
+                calling_provider = False
+                breaker.record_success()  # the provider answered, whatever we make of the output
+
+                duration = time.time() - start_time
+                self.log(role, "Timing", f"⏱️ Took {duration:.2f} seconds")
+                self.metrics.observe(role, LLMResultCache.model_name(task), duration, result, mini_crew)
+
+                # Normalize the result
+                if hasattr(result, "output"):
+                    result_output = result.output
+                elif isinstance(result, dict) and "output" in result:
+                    result_output = result["output"]
+                else:
+                    result_output = str(result)  # Force stringify fallback
+
+                self.log(role, "Output", str(result_output))
+
+                # Score topic relevance (TF-IDF cosine against the data/ corpus idf). Scoring is
+                # advisory: a failure here must not discard the output or count as a provider error
+                if isinstance(result_output, str):
+                    try:
+                        relevance = topic_relevance(self.topic, result_output)
+                    except Exception as e:
+                        self.log(role, "Warning", f"⚠️ Relevance scoring failed: {e}")
+                    else:
+                        self.log(role, "Relevance", f"🎯 Topic relevance {relevance:.3f}")
+                        if relevance < self.RELEVANCE_THRESHOLD:
+                            self.log(role, "Warning", "⚠️ Output may be unrelated to the topic.")
+
+                # Check for output sufficiency
+                if isinstance(result_output, str) and len(result_output.strip()) > 50:
+                    self.log(role, "Success")
+                    self.metrics.success(role)
+                    if attempt:
+                        self.log(role, "Retries", retry_summary(attempt + 1, failures, backoff_seconds))
+                    self.cache.set(cache_key, result_output)
+                    if remember:
+                        self._remember(role, result_output)
+                    return result_output
+                else:
+                    self.log(role, "Warning", f"Received output type: {type(result_output)}")
+                    raise InsufficientOutput("Empty or insufficient output.")
+
+            except Exception as e:
+                kind = classify_error(e, in_provider_call=calling_provider)
+                failures[kind] = failures.get(kind, 0) + 1
+                self.log(role, "Error", f"[{kind}] {e}")
+                self.metrics.error(role, kind)
+                if calling_provider:
+                    calling_provider = False
+                    breaker.record_failure(kind)
+                if not isinstance(e, (InsufficientOutput, CircuitOpenError)):  # ours carry no useful traceback
+                    self.log(role, "Traceback", traceback.format_exc())
+                if attempt + 1 >= max_attempts or not self.retry_policy.allows(kind, failures[kind]):
+                    break
+                delay = self.retry_policy.delay(kind, failures[kind], e)
+                if delay:
+                    self.log(role, "Backoff", f"⏳ {kind}: retrying in {delay:.1f}s")
+                    self.metrics.backoff(role, delay)
+                    backoff_seconds += delay
+                    time.sleep(delay)
+
+        self.log(role, "Retries", retry_summary(attempt + 1, failures, backoff_seconds))
+        self.log(role, "Failed", "Max retries reached.")
+        self.metrics.failure(role)
+        return None
+
+    def _checkpoint_memory(self):
+        # What a checkpoint stores alongside the stage outputs, restored on resume
+        return list(self.memory.get_history()) if self.memory is not None else None
+
+    def load_checkpoint(self):
+        state = self.checkpoints.load(self.run_id, self.topic)
+        if state is None and self._resume_latest:
+            latest = self.checkpoints.latest_run(self.topic)
+            state = self.checkpoints.load(latest, self.topic) if latest else None
+        if state is None:
+            self.log("Orchestrator", "Resume", "No checkpoint found; starting from the first stage.")
+            return None
+        self.run_id = state["run_id"]
+        self.completed_stages = dict(state["stages"])
+        if state.get("memory") is not None and self.memory is not None:
+            self.memory.restore(state["memory"])
+        self.log("Orchestrator", "Resume", f"⏩ Run {self.run_id}: restored {', '.join(self.completed_stages) or 'no stages'}")
+        return state
+
+    def run_stage(self, name, run, final=False):
+        # Reuse a checkpointed output on resume; otherwise run the stage and checkpoint what it produced
+        if name in self.completed_stages:
+            self.log("Orchestrator", "Checkpoint", f"⏩ {name}: using checkpointed output")
+            return self.completed_stages[name]
+        output = run()
+        if output:
+            self.completed_stages[name] = output
+            try:
+                self.checkpoints.save(self.run_id, self.topic, name, output, memory=self._checkpoint_memory(), completed=final)
+            except OSError as e:
+                self.log("Orchestrator", "Warning", f"Could not write checkpoint: {e}")
+        return output
+
+    def run_pipeline(self, resume=False):
+        # resume needs _init_checkpoints(); hosts implement the stages themselves in _run_stages()
+        try:
+            if resume:
+                self.load_checkpoint()
+            if self.cassette is None:
+                return self._run_stages()
+            with self.cassette:
+                return self._run_stages()
+        finally:
+            if self.cassette is not None:
+                self.log("Orchestrator", "Cassette", f"{self.cassette.path} {self.cassette.stats()}")
+            self.metrics.report(self.log)
+
+    def gather_content(self, gather_input):
+        # One gather agent by default; with a FanOutGatherer every source runs concurrently instead
+        if self.gatherer is None:
+            return self.execute_task(self.gather_task, gather_input)
+
+        role = "Content Gatherer"
+        self.log(role, "Fan-out", f"🔀 Gathering from {len(self.gatherer.sources)} sources in parallel")
+        started = time.perf_counter()
+        raw_content, report = self.gatherer.gather(self.topic)
+        self.metrics.observe(role, None, time.perf_counter() - started)
+        for entry in report:
+            detail = f"{entry['source']}: {entry['status']} after {entry['seconds']:.1f}s, {entry['chars']} chars"
+            if entry.get("error"):
+                detail += f" ({entry['error']})"
+            self.log(role, "Fan-out" if entry["status"] == "ok" else "Warning", detail)
+        if raw_content is None:
+            self.log(role, "Failed", "No source returned content within its budget.")
+            self.metrics.failure(role)
+            return None
+        if gather_input.get("prior_knowledge"):
+            # Recalled outputs from earlier runs become one more tagged source
+            raw_content += f"\n## Source: earlier runs\n\n{gather_input['prior_knowledge']}\n"
+        self.log(role, "Success")
+        self.metrics.success(role)
+        self._remember(role, raw_content)
+        return raw_content
+
+    def refine_content(self, raw_content):
+        budget = self.refine_chunk_tokens
+        if not budget or estimate_tokens(raw_content) <= budget:
+            return self.execute_task(self.refine_task, {"gathered_content": raw_content, "topic": self.topic})
+
+        # Map: refine section-aligned chunks in parallel, each on its own copy of the task
+        chunks = chunk_content(raw_content, budget)
+        self.log("Orchestrator", "Chunking", f"✂️ Refining {len(chunks)} chunks of ≤{budget} tokens in parallel")
+
+        def refine_chunk(chunk):
+            return self.execute_task(clone_task(self.refine_task), {"gathered_content": chunk, "topic": self.topic}, remember=False)
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.refine_workers, len(chunks)))) as pool:
+            parts = list(pool.map(refine_chunk, chunks))
+
+        # A merge missing some chunks silently drops those sources, so failed chunks get one more
+        # round and the stage fails if any are still missing
+        missing = [i for i, part in enumerate(parts) if not part]
+        if missing:
+            self.log("Orchestrator", "Warning", f"⚠️ {len(missing)} of {len(parts)} chunks failed to refine; retrying them.")
+            for i in missing:
+                parts[i] = refine_chunk(chunks[i])
+            missing = [i for i, part in enumerate(parts) if not part]
+        if missing:
+            self.log("Orchestrator", "Failed", f"❌ Chunks {', '.join(str(i + 1) for i in missing)} of {len(parts)} could not be refined.")
+            return None
+
+        # Reduce: local merge of same-named sections, no extra model call
+        refined = merge_refined(parts)
+        self._remember(self.refine_task.agent.role, refined)
+        return refined
+
+
+    def dedupe_sources(self, raw_content):
+        if not isinstance(raw_content, str):
+            return raw_content
+        deduped, stats = dedupe_content(raw_content, self.DEDUPE_THRESHOLD)
+        self.log("Orchestrator", "Dedup", (
+            f"🧹 Dropped {stats['records_dropped']} of {stats['records']} source records and "
+            f"{stats['paragraphs_dropped']} paragraphs; saved {stats['bytes_saved']} bytes (~{stats['tokens_saved']} tokens)"
+        ))
+        return deduped if deduped.strip() else raw_content
+
+    def validate_content(self, structured):
+        role = self.validate_task.agent.role
+        try:
+            report = self.prevalidator.check(structured, self.topic)
+        except Exception as e:
+            # Like relevance scoring in execute_task the local checks are advisory (they score against
+            # the data/ corpus, which may be missing or unreadable); without them the LLM validator decides
+            self.log(role, "Warning", f"⚠️ Pre-validation failed: {e}")
+            return self.execute_task(self.validate_task, {
+                "composed_content": structured,
+                "validation_issues": "automated checks unavailable; review the whole module",
+            })
+        self.log(role, "Pre-validation", (
+            f"🔎 score {report['score']:.2f}, relevance {report['relevance']:.3f}, {report['links']} links; "
+            + ("; ".join(report["issues"]) or "no issues")
+        ))
+        if report["passed"]:
+            self.log(role, "Skipped", "✅ Local checks passed; LLM validation not needed.")
+            return structured
+        return self.execute_task(self.validate_task, {
+            "composed_content": structured,
+            "validation_issues": "; ".join(report["issues"]) or "score below threshold",
+        })
@@ -1,7 +1,12 @@
-from crewai import Agent, Task, Crew, LLM
-from crewai_tools import SerperDevTool
 import streamlit as st
 from dotenv import load_dotenv
+import threading
+import time
+from collections import OrderedDict
+from factory import get_llm, get_search_tool
+from job_queue import FAILED, QUEUED, RUNNING, JobQueue
+
+# CrewAI is imported on first generation, not at page load, so the UI renders immediately
 
 load_dotenv()
 
@@ -44,14 +49,116 @@ with st.sidebar:
         """)
 
 
-def generate_content(topic):
-    llm = LLM(model="gpt-3.5-turbo")
-    search_tool = SerperDevTool(n_results=10)
+MODEL = "gpt-3.5-turbo"
+
+
+def stream_events():
+    # (event bus, chunk event class); token streaming events exist only in newer CrewAI releases
+    try:
+        from crewai.events import crewai_event_bus, LLMStreamChunkEvent
+    except ImportError:
+        try:
+            from crewai.utilities.events import crewai_event_bus, LLMStreamChunkEvent
+        except ImportError:
+            return None, None
+    return crewai_event_bus, LLMStreamChunkEvent
+
+
+@st.cache_resource
+def stream_listeners():
+    # Thread id -> event callback of the generation running on that thread. Cached so every rerun
+    # shares one registry and the CrewAI bus handler is registered only once per process.
+    listeners = {}
+
+    def forward_stream_chunk(source, event):
+        listener = listeners.get(threading.get_ident())
+        if listener is not None:
+            listener("token", getattr(event, "chunk", ""))
+
+    event_bus, chunk_event = stream_events()
+    if event_bus is not None:
+        event_bus.on(chunk_event)(forward_stream_chunk)
+    return listeners
+
+
+class ArticleCache:
+    """Finished articles keyed on (normalized topic, temperature, model), LRU with a TTL."""
+
+    def __init__(self, max_entries=64, ttl_seconds=6 * 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(topic, temperature, model):
+        return " ".join(topic.lower().split()), round(float(temperature), 2), model
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry[0] > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, article):
+        with self._lock:
+            self._entries[key] = (time.time(), article)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class CrewPool:
+    """Idle crews per (model, temperature), reused across topics and reruns.
+
+    Kickoff mutates a crew, so each generation checks one out for the length of its run; concurrent
+    sessions get a crew of their own instead of queueing behind one shared crew.
+    """
+
+    def __init__(self, build, max_idle=4):
+        self.build = build
+        self.max_idle = max_idle
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, model, temperature):
+        with self._lock:
+            idle = self._idle.get((model, temperature))
+            if idle:
+                return idle.pop()
+        return self.build(model, temperature)
+
+    def release(self, model, temperature, crew):
+        with self._lock:
+            idle = self._idle.setdefault((model, temperature), [])
+            if len(idle) < self.max_idle:
+                idle.append(crew)
+
+
+@st.cache_resource
+def article_cache():
+    return ArticleCache()
+
+
+def build_crew(model, temperature):
+    # Prompts use {topic} placeholders that CrewAI fills in on kickoff, so one crew serves every topic
+    from crewai import Agent, Task, Crew
+
+    try:
+        llm = get_llm(model, temperature=temperature, stream=stream_events()[0] is not None)
+    except TypeError:
+        llm = get_llm(model, temperature=temperature)
+    search_tool = get_search_tool(n_results=10)
 
     # First Agent: Senior Research Analyst
     senior_research_analyst = Agent(
         role="Senior Research Analyst",
-        goal=f"Research, analyze, and synthesize comprehensive information on {topic} from reliable web sources",
+        goal="Research, analyze, and synthesize comprehensive information on {topic} from reliable web sources",
         backstory="You're an expert research analyst with advanced web research skills. "
                   "You excel at finding, analyzing, and synthesizing information from "
                   "across the internet using search tools. You're skilled at "
@@ -134,28 +241,129 @@ def generate_content(topic):
         tasks=[research_task, writing_task],
         verbose=True
     )
+    return crew
 
-    return crew.kickoff(inputs={"topic": topic})
 
+@st.cache_resource
+def crew_pool():
+    return CrewPool(build_crew)
 
-# Main content area
-if generate_button:
-    with st.spinner('Generating content... This may take a moment.'):
-        try:
-            result = generate_content(topic)
-            st.markdown("### Generated Content")
-            st.markdown(result)
-
-            # Add download button
-            st.download_button(
-                label="Download Content",
-                data=result.raw,
-                file_name=f"{topic.lower().replace(' ', '_')}_article.md",
-                mime="text/markdown"
-            )
-
-        except Exception as e:
-            st.error(f"An error occurred: {str(e)}")
+
+def generate_content(topic, on_event=None, temperature=0.7, model=MODEL):
+    emit = on_event or (lambda kind, payload: None)
+    cache = article_cache()
+    key = ArticleCache.key(topic, temperature, model)
+    article = cache.get(key)
+    if article is not None:
+        emit("cached", {"topic": topic})
+        return article
+
+    pool = crew_pool()
+    crew = pool.acquire(model, temperature)
+    stages = [agent.role for agent in crew.agents]
+    finished = []
+
+    def step_callback(step):
+        tool = getattr(step, "tool", None)
+        if tool:
+            emit("tool", {"tool": tool, "input": str(getattr(step, "tool_input", ""))})
+
+    def task_callback(output):
+        finished.append(output)
+        emit("stage_done", {"agent": stages[len(finished) - 1], "output": getattr(output, "raw", str(output))})
+        if len(finished) < len(stages):
+            emit("stage_start", {"agent": stages[len(finished)]})
+
+    listeners = stream_listeners()
+    crew.step_callback = step_callback
+    crew.task_callback = task_callback
+    emit("stage_start", {"agent": stages[0]})
+    listeners[threading.get_ident()] = emit
+    try:
+        result = crew.kickoff(inputs={"topic": topic})
+    finally:
+        listeners.pop(threading.get_ident(), None)
+        pool.release(model, temperature, crew)
+
+    article = getattr(result, "raw", str(result))
+    cache.set(key, article)
+    return article
+
+
+@st.cache_resource
+def job_queue():
+    # One worker pool and job store per server process, shared by every browser session
+    return JobQueue(run_job=generate_content, max_workers=4)
+
+
+POLL_SECONDS = 1.0
+
+
+def render_events(status, events):
+    for _, kind, payload in events:
+        if kind == "cached":
+            status.write("⚡ Served from the article cache")
+        elif kind == "stage_start":
+            status.write(f"**{payload['agent']}** started")
+        elif kind == "tool":
+            status.write(f"🔧 `{payload['tool']}`: {payload['input'][:200]}")
+        elif kind == "stage_done":
+            status.write(f"✅ **{payload['agent']}** finished")
+
+
+def job_panel(job_id):
+    # Renders the job's current state: progress while it is queued or running, else the outcome
+    job = job_queue().get(job_id)
+    if job is None:
+        st.warning("This job no longer exists. Submit the topic again.")
+        return None
+
+    if job["status"] in (QUEUED, RUNNING):
+        label = "⏳ Waiting for a free worker..." if job["status"] == QUEUED else f"🔄 {job['stage'] or 'Crew'} is working..."
+        status = st.status(label, expanded=True)
+        render_events(status, job["events"][-20:])
+        if job["partial"]:
+            st.markdown(job["partial"] + "▌")
+        return job["status"]
+
+    if job["status"] == FAILED:
+        st.error(f"An error occurred: {job['error'].splitlines()[0] if job['error'] else 'unknown error'}")
+        return job["status"]
+
+    st.markdown("### Generated Content")
+    st.markdown(job["result"])
+    st.download_button(
+        label="Download Content",
+        data=job["result"],
+        file_name=f"{job['topic'].lower().replace(' ', '_')}_article.md",
+        mime="text/markdown"
+    )
+    return job["status"]
+
+
+def job_progress(job_id):
+    # Timer-driven fragment body. Once the job has finished or failed it triggers one full rerun, which
+    # renders the outcome outside the fragment, so the timer stops and the article is drawn once
+    job = job_queue().get(job_id)
+    if job is not None and job["status"] not in (QUEUED, RUNNING):
+        st.rerun()
+    job_panel(job_id)
+
+
+# Main content area: submit returns at once; the job runs on the worker pool and the page polls it
+if generate_button and topic.strip():
+    st.session_state["job_id"] = job_queue().submit(topic, temperature=round(temperature, 2), model=MODEL)
+    st.query_params["job"] = st.session_state["job_id"]  # a reload or reconnect finds the job again
+
+job_id = st.session_state.get("job_id") or st.query_params.get("job")
+if job_id:
+    job = job_queue().get(job_id)
+    if hasattr(st, "fragment") and job is not None and job["status"] in (QUEUED, RUNNING):
+        # Only the progress panel reruns on the timer, and only while the job is in progress
+        st.fragment(run_every=POLL_SECONDS)(job_progress)(job_id)
+    elif job_panel(job_id) in (QUEUED, RUNNING):
+        time.sleep(POLL_SECONDS)
+        st.rerun()
 
 # Footer
 st.markdown("---")
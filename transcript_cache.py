@@ -0,0 +1,106 @@
+# transcript_cache.py
+
+import json
+import os
+import threading
+import time
+
+
+class TranscriptUnavailable(Exception):
+    """Raised when a video is known (from the negative cache) to have no transcript."""
+
+
+class _Flight:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class TranscriptCache:
+    """On-disk store of full transcript entries keyed by video id, with a short-lived negative cache."""
+
+    def __init__(self, cache_dir=".cache/transcripts", negative_ttl_seconds=15 * 60):
+        self.cache_dir = cache_dir
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._inflight = {}
+
+    def _path(self, video_id, negative=False):
+        suffix = ".miss.json" if negative else ".json"
+        return os.path.join(self.cache_dir, f"{video_id}{suffix}")
+
+    def _read(self, path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, path, payload):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def lookup(self, video_id):
+        # Returns the cached entries, raises TranscriptUnavailable for a fresh negative entry, else None
+        stored = self._read(self._path(video_id))
+        if stored is not None:
+            return stored["entries"]
+
+        miss_path = self._path(video_id, negative=True)
+        negative = self._read(miss_path)
+        if negative is not None:
+            if time.time() - negative.get("created", 0) < self.negative_ttl_seconds:
+                raise TranscriptUnavailable(negative.get("error", "No transcript available."))
+            try:
+                os.remove(miss_path)
+            except OSError:
+                pass
+        return None
+
+    def get_or_fetch(self, video_id, fetch, is_negative=lambda e: False):
+        entries = self.lookup(video_id)
+        if entries is not None:
+            with self._lock:
+                self.hits += 1
+            return entries
+
+        # Collapse concurrent lookups of the same id into a single fetch
+        with self._lock:
+            flight = self._inflight.get(video_id)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._inflight[video_id] = flight
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            entries = list(fetch(video_id))
+            self._write(self._path(video_id), {"video_id": video_id, "fetched": time.time(), "entries": entries})
+            flight.result = entries
+            return entries
+        except Exception as e:
+            if is_negative(e):
+                self._write(self._path(video_id, negative=True), {"created": time.time(), "error": str(e)})
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(video_id, None)
+            flight.event.set()
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
@@ -0,0 +1,111 @@
+# transcript_chunker.py
+
+import re
+from content_chunker import estimate_tokens
+
+TIMESTAMP = re.compile(r"^\s*(?:(\d+):)?(?:(\d+):)?(\d+(?:\.\d+)?)\s*$")
+
+
+def format_timestamp(seconds):
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+
+def parse_timestamp(value):
+    # "1:02:03", "12:05", "725" or 725.0 -> seconds; None stays None
+    if value is None or isinstance(value, (int, float)):
+        return value
+    match = TIMESTAMP.match(str(value))
+    if not match:
+        raise ValueError(f"Unrecognized timestamp: {value!r} (use seconds, M:SS or H:MM:SS)")
+    first, second, last = match.groups()
+    parts = [float(p) for p in (first, second, last) if p is not None]
+    seconds = 0.0
+    for part in parts:
+        seconds = seconds * 60 + part
+    return seconds
+
+
+class TranscriptChunk:
+    """A run of consecutive transcript entries; the text is only joined when asked for."""
+
+    def __init__(self, index, entries, start, end, tokens):
+        self.index = index
+        self.entries = entries
+        self.start = start
+        self.end = end
+        self.tokens = tokens
+
+    @property
+    def text(self):
+        return " ".join(entry["text"].strip() for entry in self.entries if entry.get("text"))
+
+    @property
+    def span(self):
+        return f"{format_timestamp(self.start)}-{format_timestamp(self.end)}"
+
+
+def iter_chunks(entries, max_tokens=1000, start=None, end=None):
+    """Yield TranscriptChunks of at most max_tokens (estimated), split between entries.
+
+    An entry that alone is over max_tokens (auto-generated captions sometimes arrive as one long
+    entry) is cut at word boundaries first, its time span shared out by text length.
+
+    entries are youtube_transcript_api dicts ({"text", "start", "duration"}) in time order. With
+    start/end (seconds) only entries overlapping that window are chunked, and the walk stops at
+    the first entry past end, so asking for the opening minutes of a long lecture is cheap.
+    """
+    current = []
+    tokens = 0
+    index = 0
+    for entry in entries:
+        entry_start = float(entry.get("start", 0.0))
+        entry_end = entry_start + float(entry.get("duration", 0.0))
+        if end is not None and entry_start >= end:
+            break
+        if start is not None and entry_end <= start:
+            continue
+        for piece in _split_entry(entry, max_tokens):
+            entry_tokens = estimate_tokens(piece.get("text", "")) + 1
+            if current and tokens + entry_tokens > max_tokens:
+                yield _chunk(index, current, tokens)
+                index += 1
+                current = []
+                tokens = 0
+            current.append(piece)
+            tokens += entry_tokens
+    if current:
+        yield _chunk(index, current, tokens)
+
+
+def _split_entry(entry, max_tokens):
+    text = entry.get("text", "").strip()
+    if estimate_tokens(text) + 1 <= max_tokens:
+        return [entry]
+    limit = max(1, (max_tokens - 1) * 4)  # characters, so each piece fits estimate_tokens(piece) + 1 <= max_tokens
+    start = float(entry.get("start", 0.0))
+    duration = float(entry.get("duration", 0.0))
+    pieces = []
+    offset = 0
+    while offset < len(text):
+        cut = len(text) if len(text) - offset <= limit else text.rfind(" ", offset + 1, offset + limit + 1)
+        if cut <= offset:
+            cut = offset + limit  # no space to break on
+        piece = text[offset:cut]
+        pieces.append({
+            "text": piece.strip(),
+            "start": start + duration * offset / len(text),
+            "duration": duration * len(piece) / len(text),
+        })
+        offset = cut
+        while offset < len(text) and text[offset].isspace():
+            offset += 1
+    return pieces
+
+
+def _chunk(index, entries, tokens):
+    last = entries[-1]
+    end = float(last.get("start", 0.0)) + float(last.get("duration", 0.0))
+    return TranscriptChunk(index, entries, float(entries[0].get("start", 0.0)), end, tokens)
@@ -1,27 +1,113 @@
-from typing import Type
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Type
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
+import youtube_transcript_api
 from youtube_transcript_api import YouTubeTranscriptApi
+from transcript_cache import TranscriptCache
+from transcript_chunker import iter_chunks, parse_timestamp
 import re
 
+# Errors meaning the video has no transcript at all (worth negative-caching, unlike network failures)
+NO_TRANSCRIPT_ERRORS = tuple(
+    getattr(youtube_transcript_api, name)
+    for name in ("TranscriptsDisabled", "NoTranscriptFound", "NoTranscriptAvailable", "VideoUnavailable")
+    if hasattr(youtube_transcript_api, name)
+)
+
+# Shared across tool instances so every agent benefits from the same store
+transcript_cache = TranscriptCache()
+
 class YouTubeTranscriptInput(BaseModel):
     """Input schema for YouTubeTranscriptTool."""
-    video_url: str = Field(..., description="YouTube video URL or ID to extract transcript from.")
+    video_url: Optional[str] = Field(None, description="YouTube video URL or ID to extract transcript from.")
+    video_urls: Optional[List[str]] = Field(
+        None, description="Several YouTube video URLs or IDs to fetch in one call; results come back in the same order."
+    )
+    chunk: Optional[int] = Field(
+        None, description="Transcript chunk number to return (1-based, see the transcript index). Defaults to the first chunk."
+    )
+    start_time: Optional[str] = Field(
+        None, description="Only read the transcript from this point, as seconds, M:SS or H:MM:SS (e.g. '12:30')."
+    )
+    end_time: Optional[str] = Field(None, description="Only read the transcript up to this point (same formats as start_time).")
 
 class YouTubeTranscriptTool(BaseTool):
     name: str = "YouTube Transcript Tool"
-    description: str = "Fetches transcript from a YouTube video using its URL or ID."
+    description: str = (
+        "Fetches transcript from a YouTube video using its URL or ID. "
+        "Pass video_urls with a list of URLs/IDs to fetch several transcripts in a single call. "
+        "Long transcripts come back one timestamped chunk at a time with an index of all chunks; "
+        "pass chunk=N, or start_time/end_time, to read a later part of the video."
+    )
     args_schema: Type[BaseModel] = YouTubeTranscriptInput
+    max_workers: int = 4
+    chunk_tokens: int = 1000  # about the 4000 characters a call used to return
 
     def _extract_video_id(self, url: str) -> str:
         match = re.search(r"(?:v=|\/)([0-9A-Za-z_-]{11})", url)
         return match.group(1) if match else url.strip()
 
-    def _run(self, video_url: str) -> str:
+    def _get_entries(self, video_id: str) -> list:
+        return transcript_cache.get_or_fetch(
+            video_id,
+            YouTubeTranscriptApi.get_transcript,
+            is_negative=lambda e: isinstance(e, NO_TRANSCRIPT_ERRORS),
+        )
+
+    def _select_chunk(self, entries: list, chunk: Optional[int], start: Optional[float], end: Optional[float]) -> str:
+        # One pass over the entries: only the requested chunk's text is joined, the rest just feed the index
+        if chunk is None:
+            chunk = 1
+        elif chunk < 1:
+            return f"⚠️ Failed to fetch transcript: chunk numbers start at 1 (got {chunk})."
+        spans = []
+        selected = None
+        for part in iter_chunks(entries, self.chunk_tokens, start, end):
+            spans.append(part.span)
+            if part.index == chunk - 1:
+                selected = part
+        if not spans:
+            return "⚠️ Failed to fetch transcript: no transcript entries in the requested time range."
+        if selected is None:
+            return f"⚠️ Failed to fetch transcript: chunk {chunk} is out of range (1-{len(spans)})."
+
+        text = f"Transcript chunk {selected.index + 1} of {len(spans)} ({selected.span}):\n{selected.text}"
+        if len(spans) == 1:
+            return text
+        index = "\n".join(
+            f"{number}. {span}{' (shown)' if number == selected.index + 1 else ''}" for number, span in enumerate(spans, start=1)
+        )
+        return f"{text}\n\nTranscript index (pass chunk=N, or start_time/end_time, to read another part):\n{index}"
+
+    def _fetch_text(self, video_url: str, chunk: Optional[int] = None, start_time: Optional[str] = None,
+                    end_time: Optional[str] = None) -> str:
         try:
             video_id = self._extract_video_id(video_url)
-            transcript = YouTubeTranscriptApi.get_transcript(video_id)
-            full_text = " ".join([entry["text"] for entry in transcript])
-            return full_text[:4000]  # Return up to 4000 characters for context fitting
+            transcript = self._get_entries(video_id)
+            return self._select_chunk(transcript, chunk, parse_timestamp(start_time), parse_timestamp(end_time))
         except Exception as e:
             return f"⚠️ Failed to fetch transcript: {str(e)}"
+
+    def _run_batch(self, video_urls: List[str], **selection) -> str:
+        # Fetch in a bounded pool; map() keeps results in input order
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(video_urls)))) as pool:
+            texts = list(pool.map(lambda url: self._fetch_text(url, **selection), video_urls))
+
+        sections = []
+        for index, (video_url, text) in enumerate(zip(video_urls, texts), start=1):
+            video_id = self._extract_video_id(video_url)
+            sections.append(f"### Video {index}: {video_id}\nURL: {video_url}\n\n{text}")
+        return "\n\n".join(sections)
+
+    def _run(self, video_url: Optional[str] = None, video_urls: Optional[List[str]] = None, chunk: Optional[int] = None,
+             start_time: Optional[str] = None, end_time: Optional[str] = None) -> str:
+        selection = {"chunk": chunk, "start_time": start_time, "end_time": end_time}
+        urls = [url for url in (video_urls or []) if url and url.strip()]
+        if video_url and video_url.strip():
+            urls.insert(0, video_url)
+        if not urls:
+            return "⚠️ Failed to fetch transcript: no video URL or ID provided."
+        if len(urls) == 1:
+            return self._fetch_text(urls[0], **selection)
+        return self._run_batch(urls, **selection)